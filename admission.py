@@ -0,0 +1,153 @@
+"""
+Admission control for expensive endpoints.
+
+Each endpoint listed in Config.ADMISSION_LIMITS gets a token bucket per
+client (a known API key from ADMISSION_API_KEYS, else IP) and a concurrency gate with a short wait queue.
+Requests over a client's rate get 429 and requests that find the gate and
+its queue full get 503, both with Retry-After, so a burst sheds load
+instead of tying up every worker and the LLM quota.
+
+Limits are per process; with N workers the global ceiling is N times the
+configured concurrency.
+"""
+
+import math
+import time
+import threading
+from flask import g, jsonify, request
+from config import Config
+
+class TokenBucket:
+    """Per-client token buckets for one endpoint (rate is requests per minute)."""
+
+    def __init__(self, rate_per_minute, burst):
+        self.rate = rate_per_minute / 60
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._buckets = {}  # client -> (tokens, updated_at)
+
+    def take(self, client):
+        """Consume a token. Returns 0 if allowed, else seconds until one is available."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(client, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+            if tokens >= 1:
+                self._buckets[client] = (tokens - 1, now)
+                if len(self._buckets) > Config.ADMISSION_MAX_CLIENTS:
+                    self._prune(now)
+                return 0
+            self._buckets[client] = (tokens, now)
+            return (1 - tokens) / self.rate
+
+    def _prune(self, now):
+        # Buckets that have refilled completely carry no state worth keeping
+        full_after = self.burst / self.rate
+        self._buckets = {
+            client: state for client, state in self._buckets.items()
+            if now - state[1] < full_after
+        }
+
+class ConcurrencyGate:
+    """At most `limit` requests in flight; up to `queue` more wait briefly, the rest are rejected."""
+
+    def __init__(self, limit, queue):
+        self.limit = limit
+        self.queue = queue
+        self._cond = threading.Condition()
+        self._active = 0
+        self._waiting = 0
+
+    def acquire(self, timeout):
+        with self._cond:
+            if self._active < self.limit:
+                self._active += 1
+                return True
+            if self._waiting >= self.queue:
+                return False
+            self._waiting += 1
+            try:
+                if self._cond.wait_for(lambda: self._active < self.limit, timeout):
+                    self._active += 1
+                    return True
+                return False
+            finally:
+                self._waiting -= 1
+
+    def release(self):
+        with self._cond:
+            self._active -= 1
+            self._cond.notify()
+
+class Rejected(Exception):
+    """Request refused by admission control."""
+
+    def __init__(self, status, message, retry_after):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.retry_after = max(1, math.ceil(retry_after))
+
+    def body(self):
+        return {
+            'error': 'Too Many Requests' if self.status == 429 else 'Service Unavailable',
+            'message': self.message
+        }
+
+_buckets = {}
+_gates = {}
+for _endpoint, _limits in Config.ADMISSION_LIMITS.items():
+    _buckets[_endpoint] = TokenBucket(_limits['rate'], _limits['burst'])
+    _gates[_endpoint] = ConcurrencyGate(_limits['concurrency'], _limits['queue'])
+
+def admit(endpoint, client):
+    """
+    Admit a request to `endpoint` or raise Rejected.
+
+    Returns the gate to release() when the request finishes, or None for
+    endpoints without limits. May block up to ADMISSION_QUEUE_TIMEOUT
+    while queued.
+    """
+    if not Config.ADMISSION_ENABLED or endpoint not in _gates:
+        return None
+    wait = _buckets[endpoint].take(client)
+    if wait:
+        raise Rejected(429, f'Rate limit exceeded for {endpoint}', wait)
+    gate = _gates[endpoint]
+    if not gate.acquire(Config.ADMISSION_QUEUE_TIMEOUT):
+        raise Rejected(503, f'{endpoint} is at capacity, try again shortly', Config.ADMISSION_RETRY_AFTER)
+    return gate
+
+def client_key(headers, remote_addr):
+    """
+    A configured API key when the client sends one, otherwise its IP address.
+
+    Unknown keys are ignored: a made-up key per request must not get a
+    fresh token bucket each time.
+    """
+    api_key = headers.get('X-API-Key')
+    if api_key and api_key in Config.ADMISSION_API_KEYS:
+        return f'key:{api_key}'
+    if Config.ADMISSION_TRUST_PROXY and headers.get('X-Forwarded-For'):
+        return f"ip:{headers['X-Forwarded-For'].split(',')[0].strip()}"
+    return f'ip:{remote_addr}'
+
+def _before_request():
+    try:
+        endpoint = (request.endpoint or '').rsplit('.', 1)[-1]  # Config keys omit the blueprint
+        g.admission_gate = admit(endpoint, client_key(request.headers, request.remote_addr))
+    except Rejected as e:
+        response = jsonify(e.body())
+        response.status_code = e.status
+        response.headers['Retry-After'] = str(e.retry_after)
+        return response
+
+def _teardown_request(exception=None):
+    gate = g.pop('admission_gate', None)
+    if gate is not None:
+        gate.release()
+
+def init_admission(app):
+    """Enforce Config.ADMISSION_LIMITS on the app's endpoints."""
+    app.before_request(_before_request)
+    app.teardown_request(_teardown_request)
@@ -0,0 +1,127 @@
+"""
+Cold storage for old analyses.
+
+Moves the bulky text columns of analyses older than a configurable age out
+of the hot `analyses` table into compressed blobs in `analyses_archive`.
+The row itself (id, competitor, timestamp) and its parsed sections stay
+put, and the models decompress archived text transparently on read.
+
+Scraped article text (articles.content) is deliberately not archived: it
+is the source of the external-content articles_fts index, which would
+lose old articles if the column were emptied, and /api/trends scans it
+for up to TRENDS_MAX_WEEKS, well past ARCHIVE_AFTER_DAYS.
+"""
+
+import zlib
+import logging
+from datetime import datetime, timedelta
+from config import Config
+from database import get_db_connection, begin_transaction
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency; zlib is always available
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+def compress_text(text):
+    """
+    Compress text for the archive.
+
+    Returns:
+        tuple: (codec, blob) where codec is 'zstd' or 'zlib'
+    """
+    if text is None:
+        return None, None
+    data = text.encode('utf-8')
+    if zstandard is not None and Config.ARCHIVE_CODEC in ('auto', 'zstd'):
+        return 'zstd', zstandard.ZstdCompressor(level=Config.ARCHIVE_COMPRESSION_LEVEL).compress(data)
+    return 'zlib', zlib.compress(data, Config.ARCHIVE_COMPRESSION_LEVEL)
+
+def decompress_text(codec, blob):
+    """Inverse of compress_text()."""
+    if blob is None:
+        return None
+    blob = bytes(blob)  # Postgres drivers return memoryview for BYTEA
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd-archived analyses")
+        return zstandard.ZstdDecompressor().decompress(blob).decode('utf-8')
+    return zlib.decompress(blob).decode('utf-8')
+
+def load_archived(analysis_ids):
+    """
+    Fetch and decompress archived text for the given analyses.
+
+    Returns:
+        dict: {analysis_id: {"content": ..., "analysis": ...}}
+    """
+    if not analysis_ids:
+        return {}
+    conn = get_db_connection()
+    placeholders = ','.join('?' * len(analysis_ids))
+    rows = conn.execute(
+        f'SELECT analysis_id, codec, content, analysis FROM analyses_archive '
+        f'WHERE analysis_id IN ({placeholders})',
+        list(analysis_ids)
+    ).fetchall()
+    conn.close()
+    return {
+        row['analysis_id']: {
+            "content": decompress_text(row['codec'], row['content']),
+            "analysis": decompress_text(row['codec'], row['analysis'])
+        }
+        for row in rows
+    }
+
+def archive_old_analyses(max_age_days=None, batch_size=None):
+    """
+    Move analyses older than max_age_days into compressed cold storage.
+
+    Works in batches (one transaction each) so it can run against a live
+    database without holding the write lock for long.
+
+    Args:
+        max_age_days: Age threshold, defaults to Config.ARCHIVE_AFTER_DAYS
+        batch_size: Rows per transaction, defaults to Config.ARCHIVE_BATCH_SIZE
+
+    Returns:
+        int: Number of analyses archived
+    """
+    max_age_days = Config.ARCHIVE_AFTER_DAYS if max_age_days is None else max_age_days
+    batch_size = batch_size or Config.ARCHIVE_BATCH_SIZE
+    cutoff = (datetime.utcnow() - timedelta(days=max_age_days)).strftime('%Y-%m-%d %H:%M:%S')
+    archived = 0
+    conn = get_db_connection()
+    try:
+        while True:
+            rows = conn.execute(
+                'SELECT id, content, analysis FROM analyses '
+                'WHERE archived = 0 AND timestamp < ? ORDER BY id LIMIT ?',
+                (cutoff, batch_size)
+            ).fetchall()
+            if not rows:
+                break
+            begin_transaction(conn)
+            for row in rows:
+                codec, content = compress_text(row['content'])
+                content_codec, analysis = compress_text(row['analysis'])
+                conn.execute(
+                    'INSERT INTO analyses_archive (analysis_id, codec, content, analysis) VALUES (?, ?, ?, ?)',
+                    (row['id'], codec or content_codec or 'zlib', content, analysis)
+                )
+                conn.execute(
+                    'UPDATE analyses SET content = NULL, analysis = NULL, archived = 1 WHERE id = ?',
+                    (row['id'],)
+                )
+            conn.commit()
+            archived += len(rows)
+            logger.info("Archived %s analyses older than %s days", archived, max_age_days)
+    except Exception:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return archived
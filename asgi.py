@@ -0,0 +1,142 @@
+"""
+ASGI serving mode.
+
+Serves the scrape/LLM-bound routes natively on the event loop (aiohttp
+scraper coroutines and AsyncCompetitiveAnalyzer, no asyncio.run per
+request) and hands every other request to the Flask app on a thread pool.
+
+Run with:
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+    gunicorn -k uvicorn.workers.UvicornWorker --bind 0.0.0.0:5000 asgi:app
+"""
+
+import asyncio
+import logging
+from a2wsgi import WSGIMiddleware
+from werkzeug.datastructures import Headers
+from config import Config
+from main import create_app
+from database import flush_writes
+from intelligence import intelligence_snapshot, astream_intelligence
+from admission import Rejected, admit, client_key
+from services import services
+from structured_logging import incoming_request_id, request_id_var, trace_id_var
+
+logger = logging.getLogger(__name__)
+
+flask_app = create_app()
+wsgi_app = WSGIMiddleware(flask_app, workers=Config.ASGI_WSGI_THREADS)
+
+async def send_json(send, payload, status=200):
+    body = flask_app.json.dumps(payload).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode('ascii')),
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+async def proptech_articles(scope, receive, send):
+    scraper = services.scraper()
+    articles = await scraper.scrape_proptech_articles_async(max_articles=10)
+    await send_json(send, {"articles": articles})
+
+async def test_all_sources(scope, receive, send):
+    scraper = services.scraper()
+    articles = await scraper._scrape_all_sources_async(max_articles_per_source=3)
+    await send_json(send, {"articles": articles})
+
+async def proptech_intelligence_stream(scope, receive, send):
+    logger.info('Streaming PropTech intelligence')
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [
+            (b'content-type', b'application/x-ndjson'),
+            (b'cache-control', b'no-cache'),
+            (b'x-accel-buffering', b'no'),
+        ],
+    })
+    async for line in astream_intelligence(intelligence_snapshot, services.async_analyzer):
+        await send({'type': 'http.response.body', 'body': line.encode('utf-8'), 'more_body': True})
+    await send({'type': 'http.response.body', 'body': b''})
+
+# Routes served natively (endpoint names match the Flask ones for admission
+# control); everything else goes to Flask
+ASYNC_ROUTES = {
+    ('GET', '/api/proptech-articles'): ('proptech_articles', proptech_articles),
+    ('GET', '/api/test-all-sources'): ('test_all_sources', test_all_sources),
+    ('GET', '/api/proptech-intelligence/stream'): ('proptech_intelligence_stream', proptech_intelligence_stream),
+}
+
+async def send_rejection(send, rejected):
+    body = flask_app.json.dumps(rejected.body()).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': rejected.status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode('ascii')),
+            (b'retry-after', str(rejected.retry_after).encode('ascii')),
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await asyncio.to_thread(flush_writes, Config.WRITE_BEHIND_SHUTDOWN_TIMEOUT)
+            await services.ashutdown()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    if scope['type'] == 'http':
+        route = ASYNC_ROUTES.get((scope['method'], scope['path']))
+        if route is not None:
+            endpoint, handler = route
+            headers = Headers([(k.decode('latin-1'), v.decode('latin-1')) for k, v in scope['headers']])
+            client = client_key(headers, (scope.get('client') or ('', 0))[0])
+            # Each request runs in its own task (and so its own context copy)
+            request_id, trace_id = incoming_request_id(headers)
+            request_id_var.set(request_id)
+            trace_id_var.set(trace_id)
+            try:
+                # admit() may wait in the endpoint's queue, so keep it off the event loop
+                gate = await asyncio.to_thread(admit, endpoint, client)
+            except Rejected as e:
+                return await send_rejection(send, e)
+            started = False
+
+            async def tracked_send(message):
+                nonlocal started
+                started = started or message['type'] == 'http.response.start'
+                await send(message)
+
+            try:
+                return await handler(scope, receive, tracked_send)
+            except Exception as e:
+                logger.error("Error serving %s: %s", scope['path'], e)
+                if not started:
+                    return await send_json(send, {
+                        'error': 'Internal Server Error',
+                        'message': 'An unexpected error occurred'
+                    }, status=500)
+                # Headers are already out, so the status can't change; just end the body
+                try:
+                    await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+                except Exception:
+                    pass  # Client already gone
+                return
+            finally:
+                if gate is not None:
+                    gate.release()
+    return await wsgi_app(scope, receive, send)
@@ -0,0 +1,108 @@
+"""
+Bulk analysis for POST /api/analyze/batch.
+
+Items are deduplicated by (content hash, competitor), cache hits are served
+from ai_summary_cache, misses are analyzed concurrently under
+ANALYZE_BATCH_CONCURRENCY, and the new analyses are stored in one
+transaction. Failed analyses are reported per item and neither stored nor
+cached, so a retry calls the LLM again.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from config import Config
+from database import get_content_hash, get_cached_summaries, set_cached_summary
+from models import Competitor, Analysis, parse_analysis_sections
+
+logger = logging.getLogger(__name__)
+
+def is_failed_analysis(summary):
+    """CompetitiveAnalyzer.analyze_content reports errors as an "Analysis failed: ..." result."""
+    return summary.startswith('Analysis failed')
+
+def validate_batch(items):
+    """Check a batch request body; raises ValueError with a client-facing message."""
+    if not isinstance(items, list) or not items:
+        raise ValueError("items must be a non-empty list")
+    if len(items) > Config.ANALYZE_BATCH_MAX_ITEMS:
+        raise ValueError(f"A batch may contain at most {Config.ANALYZE_BATCH_MAX_ITEMS} items")
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not item.get('competitor_name') or not item.get('content'):
+            raise ValueError(f"Item {index} is missing competitor_name or content")
+        if not isinstance(item['competitor_name'], str) or not isinstance(item['content'], str):
+            raise ValueError(f"Item {index}: competitor_name and content must be strings")
+
+def analyze_batch(items, analyzer):
+    """
+    Analyze a list of {"competitor_name", "content"} items.
+
+    Items already in the summary cache are returned as-is and not stored
+    again; each distinct miss is analyzed once and stored as a new analysis.
+    Items whose analysis failed get an "error" instead and are not stored.
+
+    Returns:
+        dict: Per-item results (input order) and counts
+    """
+    keys = [(get_content_hash(item['content']), item['competitor_name']) for item in items]
+    unique = {}
+    for key, item in zip(keys, items):
+        unique.setdefault(key, item)
+
+    summaries = get_cached_summaries(unique.keys())
+    cached_keys = set(summaries)
+    misses = [key for key in unique if key not in cached_keys]
+    logger.info("Batch of %s: %s unique, %s cached, %s to analyze", len(items), len(unique), len(cached_keys), len(misses))
+
+    if misses:
+        def analyze(key):
+            item = unique[key]
+            return analyzer.analyze_content(item['content'], item['competitor_name'])
+
+        with ThreadPoolExecutor(max_workers=min(len(misses), Config.ANALYZE_BATCH_CONCURRENCY)) as pool:
+            for key, summary in zip(misses, pool.map(analyze, misses)):
+                summaries[key] = summary
+
+    failed = {key for key in misses if is_failed_analysis(summaries[key])}
+    succeeded = [key for key in misses if key not in failed]
+    if failed:
+        logger.warning("Batch: %s of %s analyses failed", len(failed), len(misses))
+    analysis_ids = {}
+    if succeeded:
+        rows = [
+            (Competitor.get_or_create(unique[key]['competitor_name'], "manual-entry"),
+             unique[key]['content'], summaries[key])
+            for key in succeeded
+        ]
+        analysis_ids = dict(zip(succeeded, Analysis.create_many(rows)))
+        for key in succeeded:
+            set_cached_summary(unique[key]['content'], key[1], summaries[key])
+
+    results = []
+    seen = set()
+    for key, item in zip(keys, items):
+        result = {
+            "competitor": item['competitor_name'],
+            "content_hash": key[0],
+            "cached": key in cached_keys,
+            "duplicate": key in seen
+        }
+        if key in failed:
+            result.update(error=summaries[key], analysis_id=None)
+        else:
+            result.update(
+                analysis=summaries[key],
+                sections=parse_analysis_sections(summaries[key]),
+                analysis_id=analysis_ids.get(key) if key not in seen else None
+            )
+        results.append(result)
+        seen.add(key)
+
+    return {
+        "status": "success",
+        "total_items": len(items),
+        "unique_items": len(unique),
+        "cache_hits": len(cached_keys),
+        "analyzed": len(succeeded),
+        "failed": len(failed),
+        "results": results
+    }
@@ -0,0 +1,56 @@
+"""
+Startup benchmark.
+
+Measures, in fresh interpreters, how long a worker takes to import the app
+module, build the app and answer its first request, plus which of the heavy
+third-party modules got imported along the way.
+
+Usage:
+    python bench_startup.py [--runs 5] [--path /api/competitors] [--module main]
+"""
+
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+PROBE = '''
+import sys, time, json
+t0 = time.perf_counter()
+module = __import__({module!r})
+t1 = time.perf_counter()
+app = module.create_app() if hasattr(module, 'create_app') else module.app
+t2 = time.perf_counter()
+status = app.test_client().get({path!r}).status_code
+t3 = time.perf_counter()
+heavy = [name for name in ('openai', 'bs4', 'aiohttp', 'requests', 'pandas', 'pyarrow', 'numpy') if name in sys.modules]
+print(json.dumps({{"import": t1 - t0, "create_app": t2 - t1, "first_request": t3 - t2,
+                  "status": status, "heavy_modules": heavy}}))
+'''
+
+def run_once(module, path):
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE.format(module=module, path=path)],
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--path', default='/api/competitors')
+    parser.add_argument('--module', default='main')
+    args = parser.parse_args()
+
+    results = [run_once(args.module, args.path) for _ in range(args.runs)]
+    print(f"{args.runs} runs of `import {args.module}` + first GET {args.path} (status {results[-1]['status']})")
+    for phase in ('import', 'create_app', 'first_request'):
+        timings = [r[phase] * 1000 for r in results]
+        print(f"  {phase:<14} median {statistics.median(timings):8.1f} ms   min {min(timings):8.1f} ms")
+    total = [(r['import'] + r['create_app'] + r['first_request']) * 1000 for r in results]
+    print(f"  {'total':<14} median {statistics.median(total):8.1f} ms")
+    print(f"  heavy modules loaded: {', '.join(results[-1]['heavy_modules']) or 'none'}")
+
+if __name__ == '__main__':
+    main()
@@ -11,19 +11,122 @@ class Config:
     
     # Application Settings
     DEBUG = True
-<<<<<<< HEAD
     PORT = 5000  # Replit uses port 5000
     SECRET_KEY = os.environ.get('SESSION_SECRET') or os.environ.get('SECRET_KEY') or 'dev-secret-key'
     
-    # Database - Force SQLite for simplicity
-    DATABASE_URL = 'sqlite:///competitive_agent.db'
-=======
-    PORT = 8080
-    SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key'
-    
-    # Database
+    # Database - plain sqlite:/// URLs use the built-in sqlite3 pool, anything
+    # else (e.g. postgresql://) goes through a pooled SQLAlchemy engine
     DATABASE_URL = os.environ.get('DATABASE_URL') or 'sqlite:///competitive_agent.db'
->>>>>>> 80b4af1a639f50148534b7d9d0c486a88f307bdb
+    
+    # SQLAlchemy engine pool (non-SQLite DATABASE_URL)
+    DB_POOL_SIZE = 5
+    DB_MAX_OVERFLOW = 10
+    DB_POOL_TIMEOUT = 30  # Seconds to wait for a free connection
+    DB_POOL_RECYCLE = 300  # Seconds before a connection is replaced
+    
+    # SQLite connection pool and pragmas
+    DB_POOL_ENABLED = True  # Reuse one connection per thread/worker
+    DB_JOURNAL_MODE = 'WAL'  # Readers don't block on writers
+    DB_SYNCHRONOUS = 'NORMAL'  # Safe with WAL, avoids an fsync per commit
+    DB_BUSY_TIMEOUT_MS = 5000
+    DB_CACHE_SIZE = -64000  # Negative means KiB, i.e. ~64MB page cache
+    DB_MMAP_SIZE = 268435456  # 256MB
+    DB_CACHED_STATEMENTS = 256  # Prepared statements kept per connection
+    
+    # Write-behind batching for analysis and cache inserts
+    WRITE_BEHIND_ENABLED = True
+    WRITE_BEHIND_BATCH_SIZE = 100  # Commit after this many queued writes...
+    WRITE_BEHIND_FLUSH_MS = 50  # ...or after this long, whichever comes first
+    WRITE_BEHIND_SHUTDOWN_TIMEOUT = 10  # Seconds to wait for pending writes at exit
+    
+    # Competitor.get_or_create name -> id lookups kept per process (names come from clients)
+    COMPETITOR_ID_CACHE_SIZE = 1024
+    
+    # Pagination for analysis listings and the dashboard feed (/api/intelligence/feed)
+    ANALYSES_PAGE_SIZE = 20
+    ANALYSES_MAX_PAGE_SIZE = 100
+    FEED_PAGE_SIZE = 20
+    FEED_MAX_PAGE_SIZE = 50
+    
+    # Cold storage for old analyses (see archive.py / `flask archive-analyses`)
+    ARCHIVE_AFTER_DAYS = 90
+    ARCHIVE_BATCH_SIZE = 500
+    ARCHIVE_CODEC = 'auto'  # 'auto' uses zstd when installed, else zlib
+    ARCHIVE_COMPRESSION_LEVEL = 6
+    
+    # Entity index (COMPANIES MENTIONED)
+    ENTITY_AUTO_CREATE_COMPETITORS = False  # Add every mentioned company to competitors
+    
+    # /api/proptech-intelligence snapshot (stale-while-revalidate)
+    INTELLIGENCE_SNAPSHOT_TTL = 900  # Seconds before a background refresh is triggered
+    INTELLIGENCE_REFRESH_LEASE = 300  # Seconds one worker owns a refresh before others may retry
+    INTELLIGENCE_ANALYSIS_WORKERS = 4  # Concurrent LLM calls for uncached articles
+    INTELLIGENCE_FIRST_BUILD_WAIT = 120  # Seconds a request waits for a first build running elsewhere
+    
+    # HTTP caching/compression for JSON APIs (see http_cache.py)
+    HTTP_USE_ORJSON = True  # Serialize with orjson when installed
+    HTTP_COMPRESS_MIN_BYTES = 1024  # Smaller bodies aren't worth compressing
+    HTTP_GZIP_LEVEL = 6
+    HTTP_BROTLI_QUALITY = 5  # Used when the brotli package is installed
+    HTTP_DEFAULT_CACHE_CONTROL = 'no-cache'  # Always revalidate via ETag
+    HTTP_CACHED_HTML_VIEWS = {'competitor'}  # HTML pages that also get ETag/304 and compression
+    HTTP_CACHE_CONTROL = {  # Per endpoint overrides
+        'proptech_intelligence': 'public, max-age=60',
+        'get_competitors': 'private, max-age=30',
+        'get_competitor_analyses': 'private, max-age=15',
+        'get_trends': 'public, max-age=300',
+        'intelligence_feed': 'private, max-age=30',
+        'competitor': 'private, no-cache',
+    }
+    
+    # ASGI serving mode (asgi.py)
+    ASGI_WSGI_THREADS = 32  # Threads running Flask routes behind the event loop
+    
+    # Background jobs (jobs.py / /api/jobs)
+    JOB_WORKERS = 2  # Worker threads per process
+    JOB_POLL_SECONDS = 5  # Idle workers check the jobs table this often
+    JOB_STALE_AFTER = 300  # Seconds without a heartbeat before a running job is resumed elsewhere
+    
+    # POST /api/analyze/batch
+    ANALYZE_BATCH_MAX_ITEMS = 500
+    ANALYZE_BATCH_CONCURRENCY = 8  # Concurrent LLM calls per batch
+    
+    # Admission control for expensive endpoints (see admission.py)
+    ADMISSION_ENABLED = True
+    ADMISSION_TRUST_PROXY = False  # Key clients by X-Forwarded-For behind a trusted proxy
+    ADMISSION_API_KEYS = frozenset(  # X-API-Key values that get their own bucket (comma-separated env var)
+        key.strip() for key in os.environ.get('ADMISSION_API_KEYS', '').split(',') if key.strip()
+    )
+    ADMISSION_QUEUE_TIMEOUT = 10  # Seconds a queued request waits for a free slot
+    ADMISSION_RETRY_AFTER = 5  # Retry-After seconds sent with 503
+    ADMISSION_MAX_CLIENTS = 10000  # Tracked clients per endpoint before idle ones are pruned
+    ADMISSION_LIMITS = {  # Per endpoint: rate (per client per minute), burst, concurrency, queue
+        'scrape_and_analyze': {'rate': 6, 'burst': 3, 'concurrency': 2, 'queue': 4},
+        'proptech_intelligence': {'rate': 60, 'burst': 10, 'concurrency': 8, 'queue': 16},
+        'proptech_intelligence_stream': {'rate': 30, 'burst': 5, 'concurrency': 4, 'queue': 8},
+        'test_all_sources': {'rate': 6, 'burst': 2, 'concurrency': 2, 'queue': 2},
+        'proptech_articles': {'rate': 12, 'burst': 3, 'concurrency': 2, 'queue': 4},
+        'full_competitive_analysis': {'rate': 2, 'burst': 1, 'concurrency': 1, 'queue': 0},
+        'analyze_competitor_content': {'rate': 30, 'burst': 10, 'concurrency': 8, 'queue': 16},
+        'analyze_batch_content': {'rate': 4, 'burst': 2, 'concurrency': 2, 'queue': 2},
+        'create_job': {'rate': 10, 'burst': 5, 'concurrency': 4, 'queue': 8},
+        'export_analyses_route': {'rate': 6, 'burst': 2, 'concurrency': 2, 'queue': 2},
+    }
+    
+    # Streaming exports (export.py / /api/export)
+    EXPORT_BATCH_SIZE = 1000  # Rows read, encoded and sent per batch (and per Parquet row group)
+    EXPORT_PARQUET_COMPRESSION = 'zstd'
+    
+    # Trend analytics (trends.py / /api/trends)
+    TRENDS_DEFAULT_WEEKS = 12
+    TRENDS_MAX_WEEKS = 104
+    TRENDS_WINDOW_WEEKS = 4  # Moving average and z-score baseline length
+    TRENDS_SPIKE_ZSCORE = 2.0  # z-score at which a week counts as a spike
+    TRENDS_SPIKE_MIN_COUNT = 3  # Ignore spikes with fewer articles/mentions than this
+    TRENDS_TOP_COMPANIES = 20  # Companies reported (most mentioned in the period)
+    TRENDS_CONTENT_CHARS = 1000  # Leading characters of each article's content scanned for keywords
+    TRENDS_LOAD_BATCH_SIZE = 5000
+    TRENDS_CACHE_TTL = 300  # Seconds a computed report is reused
     
     # AI Analysis settings
     MODEL = "gpt-3.5-turbo"
@@ -35,6 +138,14 @@ class Config:
     LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     LOG_MAX_BYTES = 10000000  # 10MB
     LOG_BACKUP_COUNT = 5
+    LOG_JSON = True  # JSON lines in the log file
+    LOG_CONSOLE_JSON = False  # Plain LOG_FORMAT text on the console
+    LOG_QUEUE_SIZE = 10000  # Records buffered for the logging thread; more are dropped, not waited on
+    LOG_SAMPLE_EVERY = {  # Keep 1 in N records below WARNING from these high-frequency loggers
+        'scraper': 10,
+        'intelligence': 5,
+        'analyzer': 5,
+    }
 
 class DevelopmentConfig(Config):
     """Development configuration."""
@@ -3,45 +3,375 @@ Database configuration and utilities for the Competitive Agent application.
 """
 
 import sqlite3
+import os
+import time
+import queue
+import atexit
+import logging
+import threading
+import weakref
 from config import Config
 import hashlib
 from typing import Optional
 
-def get_db_connection():
-    """Get a database connection."""
-<<<<<<< HEAD
-    # Handle both SQLite URL format and PostgreSQL URL (fallback to SQLite)
+logger = logging.getLogger(__name__)
+
+class PooledConnection(sqlite3.Connection):
+    """
+    SQLite connection that stays open for reuse by its owning thread.
+
+    Model code keeps the usual get_db_connection() / conn.close() pattern;
+    close() only rolls back an unfinished transaction once the outermost
+    caller is done, and release() actually closes the connection.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._checkouts = 0
+
+    def close(self):
+        self._checkouts = max(self._checkouts - 1, 0)
+        if self._checkouts == 0 and self.in_transaction:
+            self.rollback()
+
+    def release(self):
+        """Close the underlying SQLite connection."""
+        super().close()
+
+# Per-thread connection pool; reset in forked workers (see _get_pool)
+_pool = threading.local()
+_pool_pid = os.getpid()
+_pool_lock = threading.Lock()
+_open_connections = weakref.WeakSet()
+
+# Pooled SQLAlchemy engine for non-SQLite DATABASE_URLs; rebuilt in forked workers
+_engine = None
+_engine_pid = None
+_engine_lock = threading.Lock()
+
+def uses_sqlite3():
+    """True when DATABASE_URL is a plain SQLite file served by the built-in sqlite3 pool."""
     database_url = Config.DATABASE_URL
-    if database_url.startswith('postgres'):
-        # If PostgreSQL URL is provided, use a local SQLite file instead
-        db_path = 'competitive_agent.db'
-    else:
-        # Handle SQLite URL format
-        db_path = database_url.replace('sqlite:///', '') if database_url.startswith('sqlite:///') else database_url
-    
-    conn = sqlite3.connect(db_path)
-=======
-    conn = sqlite3.connect(Config.DATABASE_URL.replace('sqlite:///', ''))
->>>>>>> 80b4af1a639f50148534b7d9d0c486a88f307bdb
+    return database_url.startswith('sqlite:///') or '://' not in database_url
+
+def get_db_path():
+    """Resolve the SQLite file path from Config.DATABASE_URL."""
+    # Handle SQLite URL format
+    database_url = Config.DATABASE_URL
+    return database_url.replace('sqlite:///', '') if database_url.startswith('sqlite:///') else database_url
+
+def get_engine():
+    """
+    Get the process-wide SQLAlchemy Core engine for DATABASE_URL.
+
+    Used for Postgres and any other non-SQLite URL (e.g. postgresql://,
+    sqlite+pysqlite://). Pool sizing comes from Config.
+    """
+    global _engine, _engine_pid
+    if _engine is not None and _engine_pid == os.getpid():
+        return _engine
+    with _engine_lock:
+        if _engine is not None and _engine_pid != os.getpid():
+            # Don't touch the parent's sockets; just start a fresh pool in this worker
+            _engine.dispose(close=False)
+            _engine = None
+        if _engine is None:
+            from sqlalchemy import create_engine
+
+            database_url = Config.DATABASE_URL
+            if database_url.startswith('postgres://'):
+                database_url = 'postgresql://' + database_url[len('postgres://'):]
+            options = {'pool_pre_ping': True, 'pool_recycle': Config.DB_POOL_RECYCLE}
+            if not database_url.startswith('sqlite'):
+                options.update(
+                    pool_size=Config.DB_POOL_SIZE,
+                    max_overflow=Config.DB_MAX_OVERFLOW,
+                    pool_timeout=Config.DB_POOL_TIMEOUT
+                )
+            _engine = create_engine(database_url, **options)
+            _engine_pid = os.getpid()
+    return _engine
+
+def get_dialect():
+    """Name of the active database dialect ('sqlite', 'postgresql', ...)."""
+    return 'sqlite' if uses_sqlite3() else get_engine().dialect.name
+
+class _EngineCursor:
+    """sqlite3.Cursor-like view of a SQLAlchemy result."""
+
+    def __init__(self, result):
+        self._result = result
+        self._rows = result.mappings() if result.returns_rows else None
+
+    @property
+    def rowcount(self):
+        return self._result.rowcount
+
+    def fetchone(self):
+        return self._rows.fetchone() if self._rows is not None else None
+
+    def fetchall(self):
+        return self._rows.fetchall() if self._rows is not None else []
+
+    def fetchmany(self, size):
+        return self._rows.fetchmany(size) if self._rows is not None else []
+
+    def __iter__(self):
+        return iter(self._rows if self._rows is not None else ())
+
+class EngineConnection:
+    """
+    sqlite3.Connection-like facade over a pooled SQLAlchemy Core connection.
+
+    Lets the models keep their `?` placeholders and row['column'] access on
+    any database SQLAlchemy supports. close() returns the connection to the
+    engine's pool.
+    """
+
+    def __init__(self, connection):
+        self._connection = connection
+        self._format_params = connection.dialect.paramstyle in ('format', 'pyformat')
+
+    def _translate(self, sql, has_params):
+        if self._format_params and has_params:
+            return sql.replace('%', '%%').replace('?', '%s')
+        return sql
+
+    def execute(self, sql, params=()):
+        params = tuple(params)
+        return _EngineCursor(self._connection.exec_driver_sql(self._translate(sql, bool(params)), params))
+
+    def executemany(self, sql, seq_of_params):
+        seq_of_params = [tuple(params) for params in seq_of_params]
+        if not seq_of_params:
+            return None
+        return _EngineCursor(self._connection.exec_driver_sql(self._translate(sql, True), seq_of_params))
+
+    @property
+    def in_transaction(self):
+        return self._connection.in_transaction()
+
+    def commit(self):
+        self._connection.commit()
+
+    def rollback(self):
+        self._connection.rollback()
+
+    def close(self):
+        self._connection.close()
+
+def _configure_connection(conn):
+    """Apply the tuned pragmas from Config to a new connection."""
+    conn.execute(f'PRAGMA busy_timeout = {int(Config.DB_BUSY_TIMEOUT_MS)}')
+    conn.execute(f'PRAGMA journal_mode = {Config.DB_JOURNAL_MODE}')
+    conn.execute(f'PRAGMA synchronous = {Config.DB_SYNCHRONOUS}')
+    conn.execute(f'PRAGMA cache_size = {int(Config.DB_CACHE_SIZE)}')
+    conn.execute(f'PRAGMA mmap_size = {int(Config.DB_MMAP_SIZE)}')
+
+def _connect(factory=sqlite3.Connection):
+    if not uses_sqlite3():
+        return EngineConnection(get_engine().connect())
+    conn = sqlite3.connect(
+        get_db_path(),
+        timeout=Config.DB_BUSY_TIMEOUT_MS / 1000,
+        cached_statements=Config.DB_CACHED_STATEMENTS,
+        factory=factory
+    )
     conn.row_factory = sqlite3.Row  # This makes rows behave like dictionaries
+    _configure_connection(conn)
     return conn
 
+def _get_pool():
+    """Return the thread-local pool, discarding connections inherited across fork()."""
+    global _pool, _pool_pid
+    if _pool_pid != os.getpid():
+        with _pool_lock:
+            if _pool_pid != os.getpid():
+                _pool = threading.local()
+                _open_connections.clear()
+                _pool_pid = os.getpid()
+    return _pool
+
+def get_db_connection():
+    """
+    Get a database connection.
+
+    SQLite connections are reused per thread when pooling is enabled; other
+    databases check a connection out of the SQLAlchemy engine's pool.
+    """
+    if not Config.DB_POOL_ENABLED or not uses_sqlite3():
+        return _connect()
+    pool = _get_pool()
+    conn = getattr(pool, 'conn', None)
+    if conn is None:
+        conn = _connect(factory=PooledConnection)
+        pool.conn = conn
+        _open_connections.add(conn)
+    if not conn.in_transaction:
+        # Nothing to protect; drop counts leaked by callers that raised before close()
+        conn._checkouts = 0
+    conn._checkouts += 1
+    return conn
+
+def reset_db_connection(exception=None):
+    """Roll back anything left open on this thread's pooled connection (per-request teardown)."""
+    if not uses_sqlite3():
+        return
+    conn = getattr(_get_pool(), 'conn', None)
+    if conn is not None:
+        conn._checkouts = 0
+        if conn.in_transaction:
+            conn.rollback()
+
+def close_db_connections():
+    """Close every pooled connection owned by this process."""
+    global _pool
+    if _engine is not None and _engine_pid == os.getpid():
+        _engine.dispose()
+    if _pool_pid != os.getpid():
+        return
+    for conn in list(_open_connections):
+        try:
+            conn.release()
+        except sqlite3.Error:
+            pass
+    _open_connections.clear()
+    _pool = threading.local()
+
+atexit.register(close_db_connections)
+
+def begin_transaction(conn):
+    """Open an explicit transaction (SQLAlchemy connections begin automatically)."""
+    if isinstance(conn, sqlite3.Connection):
+        conn.execute('BEGIN')
+
+class sqlite_only(str):
+    """Marks a migration statement that only applies to SQLite (e.g. FTS5)."""
+
+def portable_ddl(sql, dialect):
+    """Rewrite the SQLite-flavoured DDL used in this module for other dialects."""
+    if dialect == 'postgresql':
+        sql = sql.replace('INTEGER PRIMARY KEY AUTOINCREMENT', 'SERIAL PRIMARY KEY')
+        sql = sql.replace(' BLOB', ' BYTEA')
+    return sql
+
+class WriteBehindQueue:
+    """
+    Background writer that group-commits queued inserts.
+
+    Request threads submit callables taking a connection; a single writer
+    thread runs them in one transaction per batch, committing every
+    `batch_size` operations or `flush_interval_ms` milliseconds, whichever
+    comes first. Each operation runs under its own savepoint so one bad row
+    doesn't discard the rest of the batch.
+    """
+
+    def __init__(self, batch_size, flush_interval_ms):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self._lock = threading.Lock()
+        self._queue = None
+        self._thread = None
+        self._pid = None
+
+    def _ensure_started(self):
+        # Threads don't survive fork(), so each worker process starts its own writer
+        if self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid != os.getpid() or not self._thread.is_alive():
+                self._queue = queue.Queue()
+                self._thread = threading.Thread(target=self._run, name='db-write-behind', daemon=True)
+                self._pid = os.getpid()
+                self._thread.start()
+
+    def submit(self, operation):
+        """Queue operation(conn) to run on the writer thread."""
+        self._ensure_started()
+        self._queue.put(operation)
+
+    def flush(self, timeout=None):
+        """Block until everything submitted so far is committed. Returns False on timeout."""
+        if self._pid != os.getpid() or self._thread is None or not self._thread.is_alive():
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def _run(self):
+        conn = _connect()
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and not isinstance(batch[-1], threading.Event):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._write_batch(conn, [op for op in batch if not isinstance(op, threading.Event)])
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()
+
+    def _write_batch(self, conn, operations):
+        if not operations:
+            return
+        try:
+            begin_transaction(conn)
+            for operation in operations:
+                conn.execute('SAVEPOINT write_behind_op')
+                try:
+                    operation(conn)
+                    conn.execute('RELEASE write_behind_op')
+                except Exception as e:
+                    conn.execute('ROLLBACK TO write_behind_op')
+                    conn.execute('RELEASE write_behind_op')
+                    logger.error("Write-behind operation failed: %s", e)
+            conn.commit()
+        except Exception as e:
+            logger.error("Write-behind batch of %s failed: %s", len(operations), e)
+            if conn.in_transaction:
+                conn.rollback()
+
+write_behind = WriteBehindQueue(Config.WRITE_BEHIND_BATCH_SIZE, Config.WRITE_BEHIND_FLUSH_MS)
+
+def defer_write(operation):
+    """Run operation(conn) on the write-behind thread, or inline if write-behind is disabled."""
+    if Config.WRITE_BEHIND_ENABLED:
+        write_behind.submit(operation)
+        return
+    conn = get_db_connection()
+    operation(conn)
+    conn.commit()
+    conn.close()
+
+def flush_writes(timeout=None):
+    """Wait for queued write-behind operations to be committed (read-your-writes)."""
+    return write_behind.flush(timeout)
+
+# Registered after close_db_connections, so it runs first at interpreter exit
+atexit.register(flush_writes, Config.WRITE_BEHIND_SHUTDOWN_TIMEOUT)
+
 def init_database():
     """Initialize the database with required tables."""
     conn = get_db_connection()
+    dialect = get_dialect()
     
     # Create competitors table
-    conn.execute('''
+    conn.execute(portable_ddl('''
         CREATE TABLE IF NOT EXISTS competitors (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             name TEXT NOT NULL,
             website TEXT NOT NULL,
             last_scraped TIMESTAMP
         )
-    ''')
+    ''', dialect))
     
     # Create analyses table
-    conn.execute('''
+    conn.execute(portable_ddl('''
         CREATE TABLE IF NOT EXISTS analyses (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             competitor_id INTEGER,
@@ -50,10 +380,30 @@ def init_database():
             timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (competitor_id) REFERENCES competitors (id)
         )
-    ''')
+    ''', dialect))
     
+    # Create analysis_sections table (one row per **SECTION:** of an analysis)
+    conn.execute(portable_ddl('''
+        CREATE TABLE IF NOT EXISTS analysis_sections (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            analysis_id INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            section TEXT NOT NULL,
+            body TEXT NOT NULL,
+            FOREIGN KEY (analysis_id) REFERENCES analyses (id)
+        )
+    ''', dialect))
+    conn.execute(portable_ddl('''
+        CREATE INDEX IF NOT EXISTS idx_analysis_sections_analysis
+        ON analysis_sections (analysis_id, position)
+    ''', dialect))
+    conn.execute(portable_ddl('''
+        CREATE INDEX IF NOT EXISTS idx_analysis_sections_section
+        ON analysis_sections (section, analysis_id)
+    ''', dialect))
+
     # Create ai_summary_cache table
-    conn.execute('''
+    conn.execute(portable_ddl('''
         CREATE TABLE IF NOT EXISTS ai_summary_cache (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             content_hash TEXT NOT NULL,
@@ -61,12 +411,416 @@ def init_database():
             summary TEXT NOT NULL,
             created TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
-    ''')
+    ''', dialect))
     
     conn.commit()
+    applied = run_migrations(conn)
     conn.close()
+    if applied:
+        print(f"Applied schema migrations: {', '.join(str(v) for v in applied)}")
     print("Database initialized successfully!")
 
+# Versioned schema migrations, applied in order on top of the base tables above.
+# Append new entries; never edit one that has already shipped.
+# Entities created from a bare "Inc."/"LLC" split off a name (see models.split_entity_list)
+_SUFFIX_ONLY_ENTITIES = (
+    "SELECT id FROM entities WHERE normalized IN "
+    "('inc', 'incorporated', 'llc', 'ltd', 'limited', 'corp', 'corporation', 'co', 'company', 'group', 'holdings', 'plc', 'gmbh', 'sa', 'ag', 'lp')"
+)
+
+MIGRATIONS = [
+    (1, 'Index analyses by competitor and time', [
+        '''
+        CREATE INDEX IF NOT EXISTS idx_analyses_competitor_timestamp
+        ON analyses (competitor_id, timestamp DESC, id DESC)
+        ''',
+    ]),
+    (2, 'Deduplicate ai_summary_cache and make (content_hash, source) unique', [
+        '''
+        DELETE FROM ai_summary_cache WHERE id NOT IN (
+            SELECT MAX(id) FROM ai_summary_cache GROUP BY content_hash, source
+        )
+        ''',
+        '''
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_ai_summary_cache_hash_source
+        ON ai_summary_cache (content_hash, source)
+        ''',
+    ]),
+    (3, 'Merge duplicate competitors and make names unique', [
+        '''
+        UPDATE analyses SET competitor_id = (
+            SELECT MIN(keep.id) FROM competitors dup
+            JOIN competitors keep ON keep.name = dup.name
+            WHERE dup.id = analyses.competitor_id
+        )
+        WHERE competitor_id IN (
+            SELECT id FROM competitors WHERE id NOT IN (
+                SELECT MIN(id) FROM competitors GROUP BY name
+            )
+        )
+        ''',
+        '''
+        DELETE FROM competitors WHERE id NOT IN (
+            SELECT MIN(id) FROM competitors GROUP BY name
+        )
+        ''',
+        '''
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_competitors_name
+        ON competitors (name)
+        ''',
+    ]),
+    (4, 'Persist scraped articles', [
+        '''
+        CREATE TABLE IF NOT EXISTS articles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            content_hash TEXT NOT NULL UNIQUE,
+            url TEXT,
+            source TEXT,
+            title TEXT,
+            content TEXT,
+            published TEXT,
+            summary TEXT,
+            companies TEXT,
+            scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        '''
+        CREATE INDEX IF NOT EXISTS idx_articles_scraped_at
+        ON articles (scraped_at DESC, id DESC)
+        ''',
+    ]),
+    (5, 'Full-text search over analyses and articles', [
+        # Self-contained index: analysis text plus its COMPANIES MENTIONED section
+        sqlite_only('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS analyses_fts
+        USING fts5(analysis, companies, tokenize = 'porter unicode61')
+        '''),
+        sqlite_only('''
+        INSERT INTO analyses_fts (rowid, analysis, companies)
+        SELECT a.id, COALESCE(a.analysis, ''), COALESCE((
+            SELECT s.body FROM analysis_sections s
+            WHERE s.analysis_id = a.id AND s.section = 'COMPANIES MENTIONED'
+        ), '')
+        FROM analyses a
+        '''),
+        sqlite_only('''
+        CREATE TRIGGER IF NOT EXISTS analyses_fts_insert AFTER INSERT ON analyses BEGIN
+            INSERT INTO analyses_fts (rowid, analysis, companies)
+            VALUES (new.id, COALESCE(new.analysis, ''), '');
+        END
+        '''),
+        sqlite_only('''
+        CREATE TRIGGER IF NOT EXISTS analyses_fts_update AFTER UPDATE OF analysis ON analyses
+        WHEN new.analysis IS NOT NULL BEGIN
+            UPDATE analyses_fts SET analysis = new.analysis WHERE rowid = new.id;
+        END
+        '''),
+        sqlite_only('''
+        CREATE TRIGGER IF NOT EXISTS analyses_fts_delete AFTER DELETE ON analyses BEGIN
+            DELETE FROM analyses_fts WHERE rowid = old.id;
+        END
+        '''),
+        sqlite_only('''
+        CREATE TRIGGER IF NOT EXISTS analysis_sections_fts_insert AFTER INSERT ON analysis_sections
+        WHEN new.section = 'COMPANIES MENTIONED' BEGIN
+            UPDATE analyses_fts SET companies = new.body WHERE rowid = new.analysis_id;
+        END
+        '''),
+        # External-content index over the articles table
+        sqlite_only('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts
+        USING fts5(title, content, companies, content = 'articles', content_rowid = 'id',
+                   tokenize = 'porter unicode61')
+        '''),
+        sqlite_only("INSERT INTO articles_fts (articles_fts) VALUES ('rebuild')"),
+        sqlite_only('''
+        CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN
+            INSERT INTO articles_fts (rowid, title, content, companies)
+            VALUES (new.id, new.title, new.content, new.companies);
+        END
+        '''),
+        sqlite_only('''
+        CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles BEGIN
+            INSERT INTO articles_fts (articles_fts, rowid, title, content, companies)
+            VALUES ('delete', old.id, old.title, old.content, old.companies);
+        END
+        '''),
+        sqlite_only('''
+        CREATE TRIGGER IF NOT EXISTS articles_fts_update AFTER UPDATE ON articles BEGIN
+            INSERT INTO articles_fts (articles_fts, rowid, title, content, companies)
+            VALUES ('delete', old.id, old.title, old.content, old.companies);
+            INSERT INTO articles_fts (rowid, title, content, companies)
+            VALUES (new.id, new.title, new.content, new.companies);
+        END
+        '''),
+    ]),
+    (6, 'Compressed cold storage for old analyses', [
+        '''
+        ALTER TABLE analyses ADD COLUMN archived INTEGER NOT NULL DEFAULT 0
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS analyses_archive (
+            analysis_id INTEGER PRIMARY KEY,
+            codec TEXT NOT NULL,
+            content BLOB,
+            analysis BLOB,
+            archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (analysis_id) REFERENCES analyses (id)
+        )
+        ''',
+    ]),
+    (7, 'Incrementally maintained per-competitor and per-source rollups', [
+        '''
+        CREATE TABLE IF NOT EXISTS competitor_stats (
+            competitor_id INTEGER PRIMARY KEY,
+            analyses_count INTEGER NOT NULL DEFAULT 0,
+            last_analysis_at TIMESTAMP
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS competitor_daily_stats (
+            competitor_id INTEGER NOT NULL,
+            day TEXT NOT NULL,
+            analyses_count INTEGER NOT NULL DEFAULT 0,
+            last_analysis_at TIMESTAMP,
+            PRIMARY KEY (competitor_id, day)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS source_stats (
+            source TEXT PRIMARY KEY,
+            articles_count INTEGER NOT NULL DEFAULT 0,
+            last_seen_at TIMESTAMP
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS source_daily_stats (
+            source TEXT NOT NULL,
+            day TEXT NOT NULL,
+            articles_count INTEGER NOT NULL DEFAULT 0,
+            last_seen_at TIMESTAMP,
+            PRIMARY KEY (source, day)
+        )
+        ''',
+        '''
+        CREATE INDEX IF NOT EXISTS idx_competitor_daily_stats_day
+        ON competitor_daily_stats (day)
+        ''',
+        '''
+        CREATE INDEX IF NOT EXISTS idx_source_daily_stats_day
+        ON source_daily_stats (day)
+        ''',
+        # One-off backfill from existing history; inserts keep them current after this
+        '''
+        INSERT INTO competitor_stats (competitor_id, analyses_count, last_analysis_at)
+        SELECT competitor_id, COUNT(*), MAX(timestamp) FROM analyses
+        WHERE competitor_id IS NOT NULL GROUP BY competitor_id
+        ''',
+        '''
+        INSERT INTO competitor_daily_stats (competitor_id, day, analyses_count, last_analysis_at)
+        SELECT competitor_id, substr(CAST(timestamp AS TEXT), 1, 10), COUNT(*), MAX(timestamp)
+        FROM analyses WHERE competitor_id IS NOT NULL
+        GROUP BY competitor_id, substr(CAST(timestamp AS TEXT), 1, 10)
+        ''',
+        '''
+        INSERT INTO source_stats (source, articles_count, last_seen_at)
+        SELECT COALESCE(source, ''), COUNT(*), MAX(scraped_at) FROM articles
+        GROUP BY COALESCE(source, '')
+        ''',
+        '''
+        INSERT INTO source_daily_stats (source, day, articles_count, last_seen_at)
+        SELECT COALESCE(source, ''), substr(CAST(scraped_at AS TEXT), 1, 10), COUNT(*), MAX(scraped_at)
+        FROM articles GROUP BY COALESCE(source, ''), substr(CAST(scraped_at AS TEXT), 1, 10)
+        ''',
+    ]),
+    (8, 'Entity index from the COMPANIES MENTIONED section', [
+        '''
+        CREATE TABLE IF NOT EXISTS entities (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            normalized TEXT NOT NULL UNIQUE,
+            first_seen_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS entity_aliases (
+            alias TEXT PRIMARY KEY,
+            entity_id INTEGER NOT NULL,
+            FOREIGN KEY (entity_id) REFERENCES entities (id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS entity_mentions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            entity_id INTEGER NOT NULL,
+            analysis_id INTEGER,
+            article_id INTEGER,
+            mentioned_at TIMESTAMP NOT NULL,
+            FOREIGN KEY (entity_id) REFERENCES entities (id),
+            FOREIGN KEY (analysis_id) REFERENCES analyses (id),
+            FOREIGN KEY (article_id) REFERENCES articles (id)
+        )
+        ''',
+        '''
+        CREATE INDEX IF NOT EXISTS idx_entity_mentions_entity
+        ON entity_mentions (entity_id, mentioned_at DESC, id DESC)
+        ''',
+        '''
+        CREATE INDEX IF NOT EXISTS idx_entity_mentions_time
+        ON entity_mentions (mentioned_at, entity_id)
+        ''',
+        '''
+        CREATE INDEX IF NOT EXISTS idx_entity_mentions_analysis
+        ON entity_mentions (analysis_id)
+        ''',
+        '''
+        CREATE INDEX IF NOT EXISTS idx_entity_mentions_article
+        ON entity_mentions (article_id)
+        ''',
+    ]),
+    (9, 'Persisted snapshots for stale-while-revalidate endpoints', [
+        '''
+        CREATE TABLE IF NOT EXISTS snapshots (
+            name TEXT PRIMARY KEY,
+            payload TEXT,
+            refreshed_at REAL NOT NULL DEFAULT 0,
+            refresh_started_at REAL
+        )
+        ''',
+    ]),
+    (10, 'Background jobs with per-item checkpoints', [
+        '''
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            params TEXT,
+            status TEXT NOT NULL DEFAULT 'queued',
+            total_items INTEGER,
+            completed_items INTEGER NOT NULL DEFAULT 0,
+            failed_items INTEGER NOT NULL DEFAULT 0,
+            error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            started_at TIMESTAMP,
+            finished_at TIMESTAMP,
+            heartbeat_at REAL
+        )
+        ''',
+        '''
+        CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, id)
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS job_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            article TEXT NOT NULL,
+            result TEXT,
+            UNIQUE (job_id, position),
+            FOREIGN KEY (job_id) REFERENCES jobs (id)
+        )
+        ''',
+    ]),
+    (11, 'Rendered-HTML cache for analysis items on competitor pages', [
+        '''
+        CREATE TABLE IF NOT EXISTS analysis_fragments (
+            analysis_id INTEGER NOT NULL,
+            template_version TEXT NOT NULL,
+            html TEXT NOT NULL,
+            rendered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (analysis_id, template_version),
+            FOREIGN KEY (analysis_id) REFERENCES analyses (id)
+        )
+        ''',
+    ]),
+    (12, 'Track which analyses have had their sections parsed', [
+        '''
+        ALTER TABLE analyses ADD COLUMN sections_parsed INTEGER NOT NULL DEFAULT 0
+        ''',
+        '''
+        UPDATE analyses SET sections_parsed = 1
+        WHERE EXISTS (SELECT 1 FROM analysis_sections s WHERE s.analysis_id = analyses.id)
+        ''',
+        '''
+        CREATE INDEX IF NOT EXISTS idx_analyses_sections_unparsed
+        ON analyses (id) WHERE sections_parsed = 0
+        ''',
+    ]),
+    (13, 'Date entity mentions by their analysis/article instead of when they were indexed', [
+        '''
+        UPDATE entity_mentions SET mentioned_at = (
+            SELECT a.timestamp FROM analyses a WHERE a.id = entity_mentions.analysis_id
+        )
+        WHERE analysis_id IS NOT NULL
+        AND EXISTS (SELECT 1 FROM analyses a WHERE a.id = entity_mentions.analysis_id AND a.timestamp IS NOT NULL)
+        ''',
+        '''
+        UPDATE entity_mentions SET mentioned_at = (
+            SELECT ar.scraped_at FROM articles ar WHERE ar.id = entity_mentions.article_id
+        )
+        WHERE article_id IS NOT NULL
+        AND EXISTS (SELECT 1 FROM articles ar WHERE ar.id = entity_mentions.article_id AND ar.scraped_at IS NOT NULL)
+        ''',
+    ]),
+    (14, 'Drop entities that are only a corporate suffix split off a company name', [
+        f'DELETE FROM entity_mentions WHERE entity_id IN ({_SUFFIX_ONLY_ENTITIES})',
+        f'DELETE FROM entity_aliases WHERE entity_id IN ({_SUFFIX_ONLY_ENTITIES})',
+        f'DELETE FROM entities WHERE id IN ({_SUFFIX_ONLY_ENTITIES})',
+    ]),
+    (15, 'Forget cached "Analysis failed" summaries so they are retried', [
+        "DELETE FROM ai_summary_cache WHERE summary LIKE 'Analysis failed%'",
+        "UPDATE articles SET summary = NULL WHERE summary LIKE 'Analysis failed%'",
+    ]),
+]
+
+def run_migrations(conn):
+    """
+    Apply pending MIGRATIONS to an existing database, each in its own transaction.
+
+    Returns:
+        list: Versions applied by this call
+    """
+    dialect = get_dialect()
+    conn.execute(portable_ddl('''
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''', dialect))
+    conn.commit()
+    current = {row['version'] for row in conn.execute('SELECT version FROM schema_migrations')}
+    applied = []
+    for version, description, statements in MIGRATIONS:
+        if version in current:
+            continue
+        try:
+            begin_transaction(conn)
+            for statement in statements:
+                if dialect != 'sqlite' and isinstance(statement, sqlite_only):
+                    continue
+                conn.execute(portable_ddl(statement, dialect))
+            conn.execute(
+                'INSERT INTO schema_migrations (version, description) VALUES (?, ?)',
+                (version, description)
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied.append(version)
+    return applied
+
+def schema_is_current():
+    """True when every migration has been applied (cheap check for worker startup)."""
+    try:
+        conn = get_db_connection()
+        row = conn.execute('SELECT MAX(version) AS version FROM schema_migrations').fetchone()
+        conn.close()
+        return row is not None and row['version'] == MIGRATIONS[-1][0]
+    except Exception:
+        return False
+
 def test_db():
     """Test the database connection."""
     try:
@@ -81,12 +835,11 @@ def get_content_hash(content: str) -> str:
     return hashlib.sha256(content.encode('utf-8')).hexdigest()
 
 def get_cached_summary(content: str, source: str) -> Optional[str]:
-<<<<<<< HEAD
     try:
         conn = get_db_connection()
         content_hash = get_content_hash(content)
         row = conn.execute(
-            'SELECT summary FROM ai_summary_cache WHERE content_hash = ? AND source = ? ORDER BY created DESC LIMIT 1',
+            'SELECT summary FROM ai_summary_cache WHERE content_hash = ? AND source = ?',
             (content_hash, source)
         ).fetchone()
         conn.close()
@@ -94,35 +847,45 @@ def get_cached_summary(content: str, source: str) -> Optional[str]:
     except Exception:
         return None
 
-def set_cached_summary(content: str, source: str, summary: str):
+def get_cached_summaries(keys):
+    """
+    Batch get_cached_summary() for (content_hash, source) pairs.
+
+    Returns:
+        dict: {(content_hash, source): summary} for the pairs that are cached
+    """
+    keys = list(set(keys))
+    found = {}
     try:
         conn = get_db_connection()
-        content_hash = get_content_hash(content)
-        conn.execute(
-            'INSERT INTO ai_summary_cache (content_hash, source, summary) VALUES (?, ?, ?)',
-            (content_hash, source, summary)
-        )
-        conn.commit()
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            hashes = list({content_hash for content_hash, _ in chunk})
+            placeholders = ','.join('?' * len(hashes))
+            rows = conn.execute(
+                f'SELECT content_hash, source, summary FROM ai_summary_cache WHERE content_hash IN ({placeholders})',
+                hashes
+            ).fetchall()
+            for row in rows:
+                found[(row['content_hash'], row['source'])] = row['summary']
         conn.close()
     except Exception:
-        pass  # Ignore cache errors 
-=======
-    conn = get_db_connection()
-    content_hash = get_content_hash(content)
-    row = conn.execute(
-        'SELECT summary FROM ai_summary_cache WHERE content_hash = ? AND source = ? ORDER BY created DESC LIMIT 1',
-        (content_hash, source)
-    ).fetchone()
-    conn.close()
-    return row['summary'] if row else None
+        return {}
+    wanted = set(keys)
+    return {key: summary for key, summary in found.items() if key in wanted}
 
-def set_cached_summary(content: str, source: str, summary: str):
-    conn = get_db_connection()
-    content_hash = get_content_hash(content)
+def _upsert_cached_summary(conn, content_hash: str, source: str, summary: str):
     conn.execute(
-        'INSERT INTO ai_summary_cache (content_hash, source, summary) VALUES (?, ?, ?)',
+        'INSERT INTO ai_summary_cache (content_hash, source, summary) VALUES (?, ?, ?) '
+        'ON CONFLICT (content_hash, source) DO UPDATE SET '
+        'summary = excluded.summary, created = CURRENT_TIMESTAMP',
         (content_hash, source, summary)
     )
-    conn.commit()
-    conn.close() 
->>>>>>> 80b4af1a639f50148534b7d9d0c486a88f307bdb
+
+def set_cached_summary(content: str, source: str, summary: str):
+    """Store a summary; written behind the request unless write-behind is disabled."""
+    try:
+        content_hash = get_content_hash(content)
+        defer_write(lambda conn: _upsert_cached_summary(conn, content_hash, source, summary))
+    except Exception:
+        pass  # Ignore cache errors 
@@ -0,0 +1,171 @@
+"""
+Streaming export of stored analyses as NDJSON, CSV or Parquet.
+
+Rows are read in keyset batches of EXPORT_BATCH_SIZE (WHERE id > last id
+ORDER BY id LIMIT n) and each batch is encoded and handed on before the
+next is read, so an export of any size runs in constant memory and never
+holds a read transaction open for the whole download. Parquet output
+writes one row group per batch and needs pyarrow.
+"""
+
+import io
+import csv
+import json
+import logging
+import importlib.util
+from config import Config
+from database import get_db_connection
+from archive import load_archived
+
+logger = logging.getLogger(__name__)
+
+EXPORT_COLUMNS = ['id', 'competitor_id', 'competitor_name', 'website', 'timestamp', 'content', 'analysis']
+
+EXPORT_FORMATS = {
+    'ndjson': {'mimetype': 'application/x-ndjson', 'extension': 'ndjson'},
+    'csv': {'mimetype': 'text/csv', 'extension': 'csv'},
+    'parquet': {'mimetype': 'application/vnd.apache.parquet', 'extension': 'parquet'},
+}
+
+def validate_format(fmt):
+    """Check an export format name; raises ValueError with a client-facing message."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown format '{fmt}', expected one of: {', '.join(EXPORT_FORMATS)}")
+    # pyarrow (and numpy with it) is optional and slow to import, so it is
+    # only looked up here and imported when a Parquet export actually runs
+    if fmt == 'parquet' and importlib.util.find_spec('pyarrow') is None:
+        raise ValueError("Parquet export requires pyarrow to be installed")
+
+def iter_analysis_batches(competitor_id=None, since=None, batch_size=None):
+    """
+    Yield lists of analysis dicts (EXPORT_COLUMNS) in id order.
+
+    Args:
+        competitor_id: Only export this competitor's analyses
+        since: Only export analyses with timestamp >= since
+        batch_size: Rows per batch, defaults to Config.EXPORT_BATCH_SIZE
+    """
+    batch_size = batch_size or Config.EXPORT_BATCH_SIZE
+    filters, params = [], []
+    if competitor_id is not None:
+        filters.append('a.competitor_id = ?')
+        params.append(competitor_id)
+    if since:
+        filters.append('a.timestamp >= ?')
+        params.append(since)
+    where = ''.join(f' AND {f}' for f in filters)
+
+    last_id = 0
+    while True:
+        conn = get_db_connection()
+        try:
+            rows = conn.execute(
+                'SELECT a.id, a.competitor_id, c.name AS competitor_name, c.website, a.timestamp, '
+                'a.content, a.analysis, a.archived '
+                'FROM analyses a LEFT JOIN competitors c ON c.id = a.competitor_id '
+                f'WHERE a.id > ?{where} ORDER BY a.id LIMIT ?',
+                [last_id] + params + [batch_size]
+            ).fetchall()
+        finally:
+            conn.close()
+        if not rows:
+            return
+        batch = [dict(row) for row in rows]
+        archived = load_archived([a['id'] for a in batch if a['archived']])
+        for a in batch:
+            if a.pop('archived'):
+                a.update(archived.get(a['id'], {}))
+            a['timestamp'] = str(a['timestamp']) if a['timestamp'] is not None else None
+        yield batch
+        last_id = batch[-1]['id']
+
+def _ndjson_chunks(batches):
+    for batch in batches:
+        yield ''.join(json.dumps(a, ensure_ascii=False) + '\n' for a in batch).encode('utf-8')
+
+def _csv_chunks(batches):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    for batch in batches:
+        writer.writerows(batch)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands its bytes back to the caller instead of storing them."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+def _parquet_schema():
+    import pyarrow
+    return pyarrow.schema([
+        ('id', pyarrow.int64()),
+        ('competitor_id', pyarrow.int64()),
+        ('competitor_name', pyarrow.string()),
+        ('website', pyarrow.string()),
+        ('timestamp', pyarrow.string()),
+        ('content', pyarrow.string()),
+        ('analysis', pyarrow.string()),
+    ])
+
+def _parquet_chunks(batches):
+    # ParquetWriter only appends, so its output can be streamed: each batch
+    # becomes a row group and the footer is written on close()
+    import pyarrow
+    import pyarrow.parquet
+    sink = _ChunkSink()
+    schema = _parquet_schema()
+    writer = pyarrow.parquet.ParquetWriter(sink, schema, compression=Config.EXPORT_PARQUET_COMPRESSION)
+    try:
+        for batch in batches:
+            writer.write_table(pyarrow.Table.from_pylist(batch, schema=schema))
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()
+    yield sink.drain()
+
+def export_analyses(fmt='ndjson', competitor_id=None, since=None, batch_size=None):
+    """
+    Generate an export of stored analyses as a stream of byte chunks.
+
+    Args:
+        fmt: 'ndjson', 'csv' or 'parquet'
+        competitor_id: Only export this competitor's analyses
+        since: Only export analyses with timestamp >= since
+        batch_size: Rows per batch (and per Parquet row group)
+
+    Yields:
+        bytes: Encoded output, one chunk per batch
+    """
+    validate_format(fmt)
+    encoders = {'ndjson': _ndjson_chunks, 'csv': _csv_chunks, 'parquet': _parquet_chunks}
+    exported = 0
+
+    def counted(batches):
+        nonlocal exported
+        for batch in batches:
+            exported += len(batch)
+            yield batch
+
+    batches = iter_analysis_batches(competitor_id=competitor_id, since=since, batch_size=batch_size)
+    yield from encoders[fmt](counted(batches))
+    logger.info("Exported %s analyses as %s", exported, fmt)
@@ -0,0 +1,100 @@
+"""
+Rendered-HTML cache for the analysis items on competitor pages.
+
+Each analysis is rendered through templates/_analysis_item.html once and
+the HTML is kept in analysis_fragments, keyed by (analysis_id, template
+version). The version is a hash of the partial's source, so editing the
+template makes every old fragment a miss without a purge. Writes that
+change what an item shows (Analysis._insert_sections) delete its
+fragments in the same transaction, and a competitor page is the
+concatenation of one batch lookup plus renders of the misses only.
+"""
+
+import hashlib
+import logging
+import threading
+from flask import current_app, render_template
+from markupsafe import Markup
+from database import get_db_connection, defer_write
+from models import Analysis
+
+logger = logging.getLogger(__name__)
+
+FRAGMENT_TEMPLATE = '_analysis_item.html'
+
+_version = {'value': None, 'uptodate': None}
+_version_lock = threading.Lock()
+
+def template_version():
+    """Short hash of the fragment template's source (re-read only when Jinja auto-reload is on)."""
+    env = current_app.jinja_env
+    with _version_lock:
+        if _version['value'] is None or (env.auto_reload and not _version['uptodate']()):
+            source, _, uptodate = env.loader.get_source(env, FRAGMENT_TEMPLATE)
+            _version['value'] = hashlib.sha1(source.encode('utf-8')).hexdigest()[:12]
+            _version['uptodate'] = uptodate or (lambda: True)
+        return _version['value']
+
+def get_fragments(analysis_ids, version):
+    """Cached HTML for these analyses at `version`, as {analysis_id: html}."""
+    if not analysis_ids:
+        return {}
+    placeholders = ','.join('?' * len(analysis_ids))
+    conn = get_db_connection()
+    rows = conn.execute(
+        f'SELECT analysis_id, html FROM analysis_fragments '
+        f'WHERE template_version = ? AND analysis_id IN ({placeholders})',
+        [version] + list(analysis_ids)
+    ).fetchall()
+    conn.close()
+    return {row['analysis_id']: row['html'] for row in rows}
+
+def store_fragments(rendered, version):
+    """
+    Save freshly rendered fragments on the write-behind queue.
+
+    Args:
+        rendered: {analysis_id: (html, number of sections it was rendered from)}
+        version: template_version() the HTML was rendered with
+    """
+    if not rendered:
+        return
+
+    def write(conn):
+        for analysis_id, (html, section_count) in rendered.items():
+            # Skip the row if the analysis' sections changed after it was read,
+            # so a late write can't re-cache HTML its invalidation already dropped
+            conn.execute(
+                'INSERT INTO analysis_fragments (analysis_id, template_version, html) '
+                'SELECT ?, ?, ? WHERE (SELECT COUNT(*) FROM analysis_sections WHERE analysis_id = ?) = ? '
+                'ON CONFLICT (analysis_id, template_version) DO UPDATE SET '
+                'html = excluded.html, rendered_at = CURRENT_TIMESTAMP',
+                (analysis_id, version, html, analysis_id, section_count)
+            )
+        placeholders = ','.join('?' * len(rendered))
+        conn.execute(
+            f'DELETE FROM analysis_fragments WHERE template_version != ? AND analysis_id IN ({placeholders})',
+            [version] + list(rendered)
+        )
+
+    defer_write(write)
+
+def render_analysis_list(analysis_ids):
+    """
+    HTML for a list of analyses, in the given order.
+
+    Cached fragments are reused as-is; only the misses are loaded, rendered
+    and stored.
+    """
+    version = template_version()
+    fragments = get_fragments(analysis_ids, version)
+    missing = [analysis_id for analysis_id in analysis_ids if analysis_id not in fragments]
+    if missing:
+        rendered = {}
+        for analysis in Analysis.get_many(missing):
+            html = render_template(FRAGMENT_TEMPLATE, analysis=analysis)
+            rendered[analysis['id']] = (html, len(analysis['sections']))
+            fragments[analysis['id']] = html
+        store_fragments(rendered, version)
+        logger.debug("Rendered %d of %d analysis fragments", len(missing), len(analysis_ids))
+    return Markup(''.join(fragments.get(analysis_id, '') for analysis_id in analysis_ids))
@@ -0,0 +1,29 @@
+"""
+Gunicorn settings and hooks.
+
+Schema setup runs once in the master (on_starting) instead of in every
+worker. With --preload the app is imported once in the master and shared
+copy-on-write with the workers; gc.freeze() keeps the garbage collector
+from touching (and so copying) those shared pages.
+"""
+
+import gc
+
+def on_starting(server):
+    from main import setup_logging, init_app_database
+    from database import flush_writes, close_db_connections
+    setup_logging()
+    try:
+        init_app_database()
+    except Exception as e:
+        server.log.error(f"Database initialization failed: {str(e)}")
+    # Don't hand open connections or pending writes to forked workers
+    flush_writes()
+    close_db_connections()
+
+def when_ready(server):
+    gc.freeze()
+
+def worker_exit(server, worker):
+    from services import services
+    services.shutdown()
@@ -0,0 +1,110 @@
+"""
+HTTP caching and compression for JSON API responses (and the HTML pages
+listed in HTTP_CACHED_HTML_VIEWS).
+
+Adds strong ETags (content hash) with 304 handling, per-route
+Cache-Control, and gzip/brotli compression above a size threshold.
+Also swaps Flask's JSON encoder for orjson when it is installed.
+"""
+
+import gzip
+import hashlib
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+from config import Config
+
+try:
+    import orjson
+except ImportError:  # Optional dependency; stdlib json is the fallback
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # Optional dependency; gzip is always available
+    brotli = None
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that serializes with orjson."""
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:  # orjson has no equivalent for json.dumps options
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS),
+            mimetype=self.mimetype
+        )
+
+def view_name():
+    """The request's view function name, without its blueprint prefix."""
+    return (request.endpoint or '').rsplit('.', 1)[-1]
+
+def choose_encoding(accept_encoding):
+    """Best supported Content-Encoding for the client, or None."""
+    if brotli is not None and accept_encoding['br']:
+        return 'br'
+    if accept_encoding['gzip']:
+        return 'gzip'
+    return None
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=Config.HTTP_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=Config.HTTP_GZIP_LEVEL, mtime=0)
+
+def _is_cacheable_type(response):
+    if response.mimetype == 'application/json':
+        return True
+    return response.mimetype == 'text/html' and view_name() in Config.HTTP_CACHED_HTML_VIEWS
+
+def cache_json_response(response):
+    """after_request hook: ETag/304, Cache-Control and compression for JSON GETs (and cached HTML views)."""
+    if (
+        request.method not in ('GET', 'HEAD')
+        or response.status_code != 200
+        or not _is_cacheable_type(response)
+        or response.direct_passthrough
+        or response.is_streamed
+        or 'Content-Encoding' in response.headers
+    ):
+        return response
+
+    data = response.get_data()
+    encoding = None
+    if len(data) >= Config.HTTP_COMPRESS_MIN_BYTES:
+        encoding = choose_encoding(request.accept_encodings)
+        response.vary.add('Accept-Encoding')
+
+    # Strong validator per representation: compressed bodies get their own tag
+    etag = hashlib.sha1(data).hexdigest()
+    if encoding:
+        etag = f'{etag}-{encoding}'
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = Config.HTTP_CACHE_CONTROL.get(
+        view_name(), Config.HTTP_DEFAULT_CACHE_CONTROL
+    )
+
+    if request.if_none_match.contains(etag):
+        response.status_code = 304
+        response.set_data(b'')
+        del response.headers['Content-Length']
+        return response
+
+    if encoding:
+        response.set_data(compress(data, encoding))
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+def init_http_cache(app):
+    """Install the faster JSON provider and the caching/compression hook."""
+    if orjson is not None and Config.HTTP_USE_ORJSON:
+        app.json = OrjsonProvider(app)
+    app.after_request(cache_json_response)
@@ -0,0 +1,498 @@
+"""
+PropTech intelligence feed.
+
+Builds the scraped + AI-analyzed article list behind /api/proptech-intelligence
+and keeps a stale-while-revalidate snapshot of it, so requests are answered
+from memory (or the database) while at most one background refresh per
+snapshot does the slow scrape and LLM calls. stream_intelligence() serves
+the same feed as NDJSON, one article per line as soon as it is ready
+(astream_intelligence() is its async twin for the ASGI app).
+"""
+
+import os
+import json
+import asyncio
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from config import Config
+from database import get_db_connection, get_cached_summary, set_cached_summary
+from models import Article, parse_analysis_sections
+from batch import is_failed_analysis
+from services import services
+
+logger = logging.getLogger(__name__)
+
+class SnapshotNotReady(Exception):
+    """No snapshot exists yet and another worker's first build didn't finish in time."""
+
+def article_content(article):
+    """The text an article summary is generated from (also its cache key)."""
+    return f"Title: {article.get('title', '')}\nContent: {article.get('content', '')}"
+
+def article_result(article, summary, cached):
+    """Shape one article for the intelligence API."""
+    return {
+        "title": article.get('title', ''),
+        "source": article.get('source', ''),
+        "url": article.get('url', ''),
+        "published": article.get('published', ''),
+        "summary": summary,
+        "sections": parse_analysis_sections(summary),
+        "cached": cached
+    }
+
+def fallback_result(article, error):
+    """Article shown without AI analysis when the analyzer can't be created."""
+    summary = f"**Source:** {article.get('source', 'Unknown')}\n\n**Content Preview:** {article.get('content', '')[:200]}...\n\n**Note:** AI analysis unavailable - {str(error)}"
+    return article_result(article, summary, False)
+
+def analyze_article(analyzer, article):
+    """Run a fresh AI analysis for one article and cache it (unless it failed)."""
+    content = article_content(article)
+    source = article.get('source', 'Unknown')
+    try:
+        analysis = analyzer.analyze_content(content, source)
+        if is_failed_analysis(analysis):
+            # Not cached or stored, so the next run asks the LLM again
+            logger.warning("Not caching failed analysis for: %.50s", article.get('title', ''))
+            return article_result(article, analysis, False)
+        set_cached_summary(content, source, analysis)
+        # Keep the article and its summary searchable
+        Article.record(article, content, analysis)
+        logger.info("Generated new analysis for: %.50s", article.get('title', ''))
+        return article_result(article, analysis, False)
+    except Exception as e:
+        logger.error('Error analyzing article %s: %s', article.get("title", ""), e)
+        return article_result(article, f"Analysis failed: {str(e)}", False)
+
+def cached_or_analyze(analyzer, article):
+    """Result for one article, from the summary cache when possible."""
+    content = article_content(article)
+    cached_summary = get_cached_summary(content, article.get('source', 'Unknown'))
+    if cached_summary:
+        Article.record(article, content, cached_summary)
+        return article_result(article, cached_summary, True)
+    return analyze_article(analyzer, article)
+
+def iter_intelligence(articles, analyzer):
+    """
+    Yield article results as soon as each one is ready.
+
+    Cache hits come out first; misses are analyzed concurrently (up to
+    INTELLIGENCE_ANALYSIS_WORKERS at a time) and yielded in completion order.
+    """
+    misses = []
+    for article in articles:
+        content = article_content(article)
+        cached_summary = get_cached_summary(content, article.get('source', 'Unknown'))
+        if cached_summary:
+            logger.info("Using cached analysis for: %.50s", article.get('title', ''))
+            Article.record(article, content, cached_summary)
+            yield article_result(article, cached_summary, True)
+        else:
+            misses.append(article)
+    if not misses:
+        return
+
+    pool = ThreadPoolExecutor(max_workers=min(len(misses), Config.INTELLIGENCE_ANALYSIS_WORKERS))
+    try:
+        futures = [pool.submit(analyze_article, analyzer, article) for article in misses]
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        # A disconnected stream shouldn't keep paying for queued analyses
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def scrape_intelligence_articles():
+    scraper = services.scraper()
+    return scraper.scrape_proptech_articles(max_articles=10)
+
+def build_intelligence():
+    """Scrape PropTech articles and analyze them (cache first). Slow: runs the scrape and LLM calls."""
+    articles = scrape_intelligence_articles()
+
+    if not articles:
+        return {"message": "No PropTech articles found", "intelligence": [], "timestamp": time.time()}
+
+    # Try to initialize analyzer and perform AI analysis
+    try:
+        analyzer = services.analyzer()
+    except Exception as e:
+        logger.error("Could not initialize analyzer: %s", e)
+        # Fallback to basic article display
+        intel_results = [fallback_result(article, e) for article in articles[:8]]
+        return {
+            "total_articles_found": len(articles),
+            "analyses_completed": len(intel_results),
+            "intelligence": intel_results,
+            "timestamp": time.time(),
+            "note": f"AI analysis temporarily unavailable: {str(e)}"
+        }
+
+    intel_results = list(iter_intelligence(articles[:5], analyzer))  # Limit to 5 for performance
+    return {
+        "total_articles_found": len(articles),
+        "analyses_completed": len(intel_results),
+        "intelligence": intel_results,
+        "timestamp": time.time(),
+        "note": "AI-powered competitive intelligence analysis"
+    }
+
+def ndjson_event(**fields):
+    return json.dumps(fields) + '\n'
+
+def snapshot_events(payload, meta):
+    """Replay a stored payload as stream events."""
+    yield ndjson_event(type='meta', total_articles_found=payload.get('total_articles_found', 0), snapshot=meta)
+    for article in payload.get('intelligence', []):
+        yield ndjson_event(type='article', article=article)
+    yield ndjson_event(type='done', analyses_completed=len(payload.get('intelligence', [])),
+                       note=payload.get('note') or payload.get('message'))
+
+def fallback_events(articles, error):
+    for article in articles[:8]:
+        yield ndjson_event(type='article', article=fallback_result(article, error))
+    yield ndjson_event(type='done', analyses_completed=min(len(articles), 8),
+                       note=f"AI analysis temporarily unavailable: {str(error)}")
+
+def finish_stream(snapshot, articles, intel_results):
+    """Store the streamed results as the new snapshot and return the final event."""
+    note = "AI-powered competitive intelligence analysis"
+    snapshot.put({
+        "total_articles_found": len(articles),
+        "analyses_completed": len(intel_results),
+        "intelligence": intel_results,
+        "timestamp": time.time(),
+        "note": note
+    })
+    return ndjson_event(type='done', analyses_completed=len(intel_results), note=note)
+
+def waiting_events(payload, meta):
+    """Replay the snapshot another request built, or report that it isn't ready yet."""
+    if payload is None:
+        yield ndjson_event(type='error', message="PropTech intelligence is still being prepared, try again shortly")
+        return
+    yield from snapshot_events(payload, meta)
+
+def stream_intelligence(snapshot):
+    """
+    Yield the intelligence feed as NDJSON events, one article per line.
+
+    An existing snapshot is replayed straight away, even a stale one
+    (meta "stale": true, with a background refresh started). Only when no
+    snapshot exists at all are articles scraped and emitted as their
+    analyses finish, by the one request holding the snapshot's refresh
+    lease; the finished payload becomes the snapshot. Concurrent requests
+    wait for it instead of repeating the scrape and LLM calls.
+
+    Events: {"type": "meta"}, {"type": "article", "article": {...}},
+    {"type": "done"}, or {"type": "error", "message": ...}.
+    """
+    payload, meta = snapshot.get_if_built()
+    if payload is not None:
+        yield from snapshot_events(payload, meta)
+        return
+    if not snapshot.acquire_lease():
+        yield from waiting_events(*snapshot.wait_for_payload(snapshot.wait))
+        return
+
+    stored = False
+    try:
+        articles = scrape_intelligence_articles()
+        yield ndjson_event(type='meta', total_articles_found=len(articles), snapshot=None)
+        if not articles:
+            yield ndjson_event(type='done', analyses_completed=0, note="No PropTech articles found")
+            return
+
+        try:
+            analyzer = services.analyzer()
+        except Exception as e:
+            logger.error("Could not initialize analyzer: %s", e)
+            yield from fallback_events(articles, e)
+            return
+
+        intel_results = []
+        for result in iter_intelligence(articles[:5], analyzer):
+            intel_results.append(result)
+            yield ndjson_event(type='article', article=result)
+        done = finish_stream(snapshot, articles, intel_results)  # Storing the snapshot releases the lease
+        stored = True
+        yield done
+    except Exception as e:
+        logger.error('PropTech intelligence stream error: %s', e)
+        yield ndjson_event(type='error', message=str(e))
+    finally:
+        if not stored:  # Also runs when the client disconnects mid-stream
+            snapshot.release_lease()
+
+# Async variants for the ASGI serving mode (asgi.py): same events, but the
+# scrape and LLM calls are awaited instead of holding a thread.
+
+async def analyze_article_async(analyzer, article):
+    """Async analyze_article() using an AsyncCompetitiveAnalyzer."""
+    content = article_content(article)
+    source = article.get('source', 'Unknown')
+    try:
+        analysis = await analyzer.analyze_content(content, source)
+        if is_failed_analysis(analysis):
+            # Not cached or stored, so the next run asks the LLM again
+            logger.warning("Not caching failed analysis for: %.50s", article.get('title', ''))
+            return article_result(article, analysis, False)
+        set_cached_summary(content, source, analysis)
+        Article.record(article, content, analysis)
+        logger.info("Generated new analysis for: %.50s", article.get('title', ''))
+        return article_result(article, analysis, False)
+    except Exception as e:
+        logger.error('Error analyzing article %s: %s', article.get("title", ""), e)
+        return article_result(article, f"Analysis failed: {str(e)}", False)
+
+async def aiter_intelligence(articles, analyzer):
+    """Async iter_intelligence(): cache hits first, then analyses as they complete."""
+    summaries = await asyncio.to_thread(
+        lambda: [get_cached_summary(article_content(a), a.get('source', 'Unknown')) for a in articles]
+    )
+    misses = []
+    for article, cached_summary in zip(articles, summaries):
+        if cached_summary:
+            Article.record(article, article_content(article), cached_summary)
+            yield article_result(article, cached_summary, True)
+        else:
+            misses.append(article)
+
+    semaphore = asyncio.Semaphore(Config.INTELLIGENCE_ANALYSIS_WORKERS)
+
+    async def analyze(article):
+        async with semaphore:
+            return await analyze_article_async(analyzer, article)
+
+    tasks = [asyncio.ensure_future(analyze(article)) for article in misses]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+async def astream_intelligence(snapshot, get_analyzer):
+    """Async stream_intelligence(); get_analyzer() returns a (shared) AsyncCompetitiveAnalyzer."""
+    payload, meta = await asyncio.to_thread(snapshot.get_if_built)
+    if payload is not None:
+        for line in snapshot_events(payload, meta):
+            yield line
+        return
+    if not await asyncio.to_thread(snapshot.acquire_lease):
+        deadline = time.monotonic() + snapshot.wait
+        while payload is None and time.monotonic() < deadline:
+            await asyncio.sleep(1)
+            payload, meta = await asyncio.to_thread(snapshot.get_if_built)
+        for line in waiting_events(payload, meta):
+            yield line
+        return
+
+    stored = False
+    try:
+        articles = await services.scraper().scrape_proptech_articles_async(max_articles=10)
+        yield ndjson_event(type='meta', total_articles_found=len(articles), snapshot=None)
+        if not articles:
+            yield ndjson_event(type='done', analyses_completed=0, note="No PropTech articles found")
+            return
+
+        try:
+            analyzer = get_analyzer()
+        except Exception as e:
+            logger.error("Could not initialize analyzer: %s", e)
+            for line in fallback_events(articles, e):
+                yield line
+            return
+
+        intel_results = []
+        async for result in aiter_intelligence(articles[:5], analyzer):
+            intel_results.append(result)
+            yield ndjson_event(type='article', article=result)
+        done = await asyncio.to_thread(finish_stream, snapshot, articles, intel_results)
+        stored = True
+        yield done
+    except Exception as e:
+        logger.error('PropTech intelligence stream error: %s', e)
+        yield ndjson_event(type='error', message=str(e))
+    finally:
+        if not stored:
+            await asyncio.to_thread(snapshot.release_lease)
+
+class IntelligenceSnapshot:
+    """
+    Stale-while-revalidate cache of an expensive payload.
+
+    The current payload lives in memory per worker and in the `snapshots`
+    table, so a fresh worker starts warm and workers share refreshes. Once
+    the payload is older than `ttl`, callers still get it immediately while
+    one background thread rebuilds it; a lease row in the database keeps
+    other workers from starting the same refresh.
+    """
+
+    def __init__(self, name, builder, ttl, lease, wait):
+        self.name = name
+        self.builder = builder
+        self.ttl = ttl
+        self.lease = lease
+        self.wait = wait  # Seconds a caller waits for a first build running elsewhere
+        self._lock = threading.Lock()
+        self._payload = None
+        self._refreshed_at = 0
+        self._refresh_thread = None
+        self._refresh_pid = None
+
+    def get(self):
+        """
+        Return (payload, meta) right away, kicking off a background refresh if stale.
+
+        Only the very first build (nothing in memory or the database) blocks.
+        It runs in whichever caller holds the lease; concurrent first callers,
+        in this worker or others, wait up to `wait` seconds for it and then
+        raise SnapshotNotReady.
+        """
+        if self._payload is None or self._is_stale():
+            self._load_from_db()
+        if self._payload is None:
+            self._build_first()
+        stale = self._is_stale()
+        if stale:
+            self.refresh_async()
+        return self._payload, self._meta(stale)
+
+    def _build_first(self):
+        with self._lock:
+            if self._payload is None and self.acquire_lease():
+                try:
+                    self._store(self.builder())  # Storing releases the lease
+                except Exception:
+                    self.release_lease()
+                    raise
+                return
+        if self._payload is None and self.wait_for_payload(self.wait)[0] is None:
+            raise SnapshotNotReady(f"The {self.name} snapshot is still being built")
+
+    def get_if_built(self):
+        """
+        Like get(), but never builds: (None, None) if no payload exists yet.
+
+        A stale payload is still returned (meta "stale": true) and refreshed
+        in the background.
+        """
+        if self._payload is None or self._is_stale():
+            self._load_from_db()
+        if self._payload is None:
+            return None, None
+        stale = self._is_stale()
+        if stale:
+            self.refresh_async()
+        return self._payload, self._meta(stale)
+
+    def wait_for_payload(self, timeout, interval=1.0):
+        """Poll for a payload being built elsewhere; get_if_built(), or (None, None) after `timeout` seconds."""
+        deadline = time.monotonic() + timeout
+        while True:
+            payload, meta = self.get_if_built()
+            if payload is not None or time.monotonic() >= deadline:
+                return payload, meta
+            time.sleep(interval)
+
+    def put(self, payload):
+        """Replace the payload with one built elsewhere (e.g. by a stream)."""
+        self._store(payload)
+
+    def _meta(self, stale):
+        return {
+            "refreshed_at": self._refreshed_at,
+            "stale": stale,
+            "refreshing": self.is_refreshing()
+        }
+
+    def _is_stale(self):
+        return time.time() - self._refreshed_at > self.ttl
+
+    def is_refreshing(self):
+        return (
+            self._refresh_pid == os.getpid()
+            and self._refresh_thread is not None
+            and self._refresh_thread.is_alive()
+        )
+
+    def refresh_async(self):
+        """Start a background refresh unless one is already running here or in another worker."""
+        with self._lock:
+            if self.is_refreshing() or not self.acquire_lease():
+                return False
+            self._refresh_thread = threading.Thread(
+                target=self._refresh, name=f'snapshot-{self.name}', daemon=True
+            )
+            self._refresh_pid = os.getpid()
+            self._refresh_thread.start()
+            return True
+
+    def _refresh(self):
+        try:
+            self._store(self.builder())
+            logger.info("Refreshed %s snapshot", self.name)
+        except Exception as e:
+            logger.error("Refreshing %s snapshot failed: %s", self.name, e)
+            self.release_lease()
+
+    def acquire_lease(self):
+        """Claim the right to rebuild this snapshot; storing a payload releases it."""
+        now = time.time()
+        conn = get_db_connection()
+        conn.execute(
+            'INSERT INTO snapshots (name, refreshed_at) VALUES (?, 0) ON CONFLICT (name) DO NOTHING',
+            (self.name,)
+        )
+        acquired = conn.execute(
+            'UPDATE snapshots SET refresh_started_at = ? '
+            'WHERE name = ? AND (refresh_started_at IS NULL OR refresh_started_at < ?)',
+            (now, self.name, now - self.lease)
+        ).rowcount > 0
+        conn.commit()
+        conn.close()
+        return acquired
+
+    def release_lease(self):
+        conn = get_db_connection()
+        conn.execute('UPDATE snapshots SET refresh_started_at = NULL WHERE name = ?', (self.name,))
+        conn.commit()
+        conn.close()
+
+    def _load_from_db(self):
+        """Pick up a newer payload written by another worker."""
+        conn = get_db_connection()
+        row = conn.execute(
+            'SELECT payload, refreshed_at FROM snapshots WHERE name = ? AND refreshed_at > ?',
+            (self.name, self._refreshed_at)
+        ).fetchone()
+        conn.close()
+        if row and row['payload']:
+            self._payload = json.loads(row['payload'])
+            self._refreshed_at = row['refreshed_at']
+
+    def _store(self, payload):
+        refreshed_at = time.time()
+        conn = get_db_connection()
+        conn.execute(
+            'INSERT INTO snapshots (name, payload, refreshed_at, refresh_started_at) VALUES (?, ?, ?, NULL) '
+            'ON CONFLICT (name) DO UPDATE SET payload = excluded.payload, '
+            'refreshed_at = excluded.refreshed_at, refresh_started_at = NULL',
+            (self.name, json.dumps(payload), refreshed_at)
+        )
+        conn.commit()
+        conn.close()
+        self._payload = payload
+        self._refreshed_at = refreshed_at
+
+intelligence_snapshot = IntelligenceSnapshot(
+    'proptech-intelligence',
+    build_intelligence,
+    ttl=Config.INTELLIGENCE_SNAPSHOT_TTL,
+    lease=Config.INTELLIGENCE_REFRESH_LEASE,
+    wait=Config.INTELLIGENCE_FIRST_BUILD_WAIT
+)
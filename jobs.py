@@ -0,0 +1,254 @@
+"""
+Background jobs.
+
+Long runs such as a full competitive analysis are enqueued with
+Job.create() and executed by a small pool of worker threads instead of
+inside a web request. Progress is checkpointed per article in the jobs /
+job_items tables, so GET /api/jobs/<id> shows partial results and a job
+interrupted by a restart resumes from its last finished article.
+"""
+
+import os
+import json
+import time
+import queue
+import logging
+import threading
+from config import Config
+from database import get_db_connection, begin_transaction
+from intelligence import cached_or_analyze
+from batch import is_failed_analysis
+from services import services
+
+logger = logging.getLogger(__name__)
+
+class Job:
+    """Job rows and their checkpointed items."""
+
+    @staticmethod
+    def create(kind, params=None):
+        """Insert a queued job and return its id."""
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind '{kind}'. Choose from: {', '.join(JOB_KINDS)}")
+        conn = get_db_connection()
+        job_id = conn.execute(
+            'INSERT INTO jobs (kind, params) VALUES (?, ?) RETURNING id',
+            (kind, json.dumps(params or {}))
+        ).fetchone()['id']
+        conn.commit()
+        conn.close()
+        return job_id
+
+    @staticmethod
+    def get(job_id, include_items=True):
+        """Job status, progress and (optionally) the results finished so far."""
+        conn = get_db_connection()
+        row = conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        if row is None:
+            conn.close()
+            return None
+        job = dict(row)
+        job['params'] = json.loads(job['params'] or '{}')
+        if include_items:
+            items = conn.execute(
+                'SELECT position, status, article, result FROM job_items WHERE job_id = ? ORDER BY position',
+                (job_id,)
+            ).fetchall()
+            job['items'] = []
+            for item in items:
+                article = json.loads(item['article'])
+                job['items'].append({
+                    "position": item['position'],
+                    "status": item['status'],
+                    "title": article.get('title', ''),
+                    "source": article.get('source', ''),
+                    "url": article.get('url', ''),
+                    "result": json.loads(item['result']) if item['result'] else None
+                })
+        conn.close()
+        return job
+
+    @staticmethod
+    def claim(job_id=None):
+        """
+        Mark a queued (or abandoned running) job as running by this worker.
+
+        With no job_id, claims the oldest such job. Returns the job id, or
+        None if there was nothing to claim (e.g. another worker got it first).
+        """
+        now = time.time()
+        stale = now - Config.JOB_STALE_AFTER
+        conn = get_db_connection()
+        try:
+            if job_id is None:
+                row = conn.execute(
+                    "SELECT id FROM jobs WHERE status = 'queued' "
+                    "OR (status = 'running' AND heartbeat_at < ?) ORDER BY id LIMIT 1",
+                    (stale,)
+                ).fetchone()
+                if row is None:
+                    return None
+                job_id = row['id']
+            claimed = conn.execute(
+                "UPDATE jobs SET status = 'running', heartbeat_at = ?, "
+                "started_at = COALESCE(started_at, CURRENT_TIMESTAMP) "
+                "WHERE id = ? AND (status = 'queued' OR (status = 'running' AND heartbeat_at < ?))",
+                (now, job_id, stale)
+            ).rowcount > 0
+            conn.commit()
+            return job_id if claimed else None
+        finally:
+            conn.close()
+
+    @staticmethod
+    def add_items(job_id, articles):
+        """Checkpoint the scraped articles (first phase of a run)."""
+        conn = get_db_connection()
+        try:
+            begin_transaction(conn)
+            for position, article in enumerate(articles):
+                conn.execute(
+                    'INSERT INTO job_items (job_id, position, article) VALUES (?, ?, ?) '
+                    'ON CONFLICT (job_id, position) DO NOTHING',
+                    (job_id, position, json.dumps(article))
+                )
+            conn.execute(
+                'UPDATE jobs SET total_items = ?, heartbeat_at = ? WHERE id = ?',
+                (len(articles), time.time(), job_id)
+            )
+            conn.commit()
+        except Exception:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def pending_items(job_id):
+        conn = get_db_connection()
+        rows = conn.execute(
+            "SELECT id, article FROM job_items WHERE job_id = ? AND status = 'pending' ORDER BY position",
+            (job_id,)
+        ).fetchall()
+        conn.close()
+        return [(row['id'], json.loads(row['article'])) for row in rows]
+
+    @staticmethod
+    def complete_item(job_id, item_id, result, failed=False):
+        """Store one item's result and bump progress in a single transaction."""
+        conn = get_db_connection()
+        try:
+            begin_transaction(conn)
+            conn.execute(
+                'UPDATE job_items SET status = ?, result = ? WHERE id = ?',
+                ('failed' if failed else 'done', json.dumps(result), item_id)
+            )
+            counter = 'failed_items' if failed else 'completed_items'
+            conn.execute(
+                f'UPDATE jobs SET {counter} = {counter} + 1, heartbeat_at = ? WHERE id = ?',
+                (time.time(), job_id)
+            )
+            conn.commit()
+        except Exception:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def finish(job_id, status, error=None):
+        conn = get_db_connection()
+        conn.execute(
+            'UPDATE jobs SET status = ?, error = ?, finished_at = CURRENT_TIMESTAMP WHERE id = ?',
+            (status, error, job_id)
+        )
+        conn.commit()
+        conn.close()
+
+def run_full_competitive_analysis(job_id, params):
+    """Scrape all sources, then analyze each article, checkpointing after every one."""
+    job = Job.get(job_id, include_items=False)
+    if job['total_items'] is None:
+        scraper = services.scraper()
+        articles = scraper.scrape_all_sources(
+            max_articles_per_source=int(params.get('max_articles_per_source', 5))
+        )
+        Job.add_items(job_id, articles)
+        logger.info("Job %s: scraped %d articles", job_id, len(articles))
+
+    analyzer = services.analyzer()
+    for item_id, article in Job.pending_items(job_id):
+        result = cached_or_analyze(analyzer, article)
+        Job.complete_item(job_id, item_id, result, failed=is_failed_analysis(result['summary']))
+
+# Job kind -> runner(job_id, params)
+JOB_KINDS = {
+    'full-competitive-analysis': run_full_competitive_analysis,
+}
+
+class JobRunner:
+    """
+    Pool of worker threads executing jobs.
+
+    Submitted job ids are picked up immediately; idle workers also poll the
+    jobs table, which picks up jobs queued by other processes and jobs whose
+    worker died (no heartbeat for JOB_STALE_AFTER seconds).
+    """
+
+    def __init__(self, workers, poll_interval):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._queue = None
+        self._threads = []
+        self._pid = None
+
+    def start(self):
+        # Threads don't survive fork(), so each worker process starts its own pool
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._threads = [
+                    threading.Thread(target=self._run, name=f'job-worker-{n}', daemon=True)
+                    for n in range(self.workers)
+                ]
+                self._pid = os.getpid()
+                for thread in self._threads:
+                    thread.start()
+
+    def submit(self, job_id):
+        self.start()
+        self._queue.put(job_id)
+
+    def _run(self):
+        while True:
+            try:
+                job_id = Job.claim(self._queue.get(timeout=self.poll_interval))
+            except queue.Empty:
+                job_id = Job.claim()
+            except Exception as e:
+                logger.error("Claiming job failed: %s", e)
+                continue
+            if job_id is not None:
+                self._execute(job_id)
+
+    def _execute(self, job_id):
+        try:
+            job = Job.get(job_id, include_items=False)
+            logger.info("Running job %s (%s)", job_id, job['kind'])
+            JOB_KINDS[job['kind']](job_id, job['params'])
+            Job.finish(job_id, 'completed')
+            logger.info("Job %s completed", job_id)
+        except Exception as e:
+            logger.error("Job %s failed: %s", job_id, e)
+            try:
+                Job.finish(job_id, 'failed', str(e))
+            except Exception as finish_error:
+                # Left 'running'; it is retried once its heartbeat goes stale
+                logger.error("Could not mark job %s failed: %s", job_id, finish_error)
+
+job_runner = JobRunner(Config.JOB_WORKERS, Config.JOB_POLL_SECONDS)
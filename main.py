@@ -1,74 +1,135 @@
 import os
 import logging
 from logging.handlers import RotatingFileHandler
-import time
 import asyncio
-from flask import Flask, jsonify, render_template, request
+import threading
+import click
+from flask import Blueprint, Flask, Response, current_app, jsonify, render_template, request, stream_with_context
 from config import get_config
-<<<<<<< HEAD
-from database import init_database, test_db, get_db_connection, get_cached_summary, set_cached_summary
-=======
-from database import init_database, test_db, get_db_connection
->>>>>>> 80b4af1a639f50148534b7d9d0c486a88f307bdb
-from models import Competitor, Analysis
-from analyzer import CompetitiveAnalyzer
-from scraper import CompetitiveScraper
-import requests
-from concurrent.futures import ThreadPoolExecutor
+from database import init_database, test_db, reset_db_connection, schema_is_current
+from models import Competitor, Analysis, Article, Entity, Stats, parse_analysis_sections
+from archive import archive_old_analyses
+from intelligence import SnapshotNotReady, intelligence_snapshot, stream_intelligence
+from http_cache import init_http_cache
+from admission import init_admission
+from jobs import Job, job_runner
+from batch import validate_batch, analyze_batch
+from services import services, init_services
+from structured_logging import JsonFormatter, configure_logging, init_request_ids
+from export import EXPORT_FORMATS, validate_format, export_analyses
+from fragments import render_analysis_list
 
 """
 Competitive Agent
 Main entry point for the competitive agent application.
 This module handles the initialization and main execution flow of the agent.
+
+Importing it has no side effects: create_app() builds the Flask app, and
+the heavy analyzer/scraper modules (openai, bs4, aiohttp) are only imported
+when a route first asks services.py for them.
 """
 
-# Initialize Flask app
-app = Flask(__name__)
-app.config.from_object(get_config())
+logger = logging.getLogger(__name__)
+
+bp = Blueprint('main', __name__, cli_group=None)
 
 # Configure logging
 def setup_logging():
-    """Configure logging for the application."""
+    """
+    Configure logging for the application.
+
+    Log calls only enqueue the record; a background thread writes JSON lines
+    to the rotating log file and plain text to the console (see
+    structured_logging.py).
+    """
     config = get_config()
     
     # Create logs directory if it doesn't exist
     if not os.path.exists('logs'):
         os.makedirs('logs')
     
-    # Configure logging
-    logging.basicConfig(
-        level=getattr(logging, config.LOG_LEVEL),
-        format=config.LOG_FORMAT,
-        handlers=[
-            RotatingFileHandler(
-                f'logs/{config.LOG_FILE}',
-                maxBytes=config.LOG_MAX_BYTES,
-                backupCount=config.LOG_BACKUP_COUNT
-            ),
-            logging.StreamHandler()
-        ]
+    file_handler = RotatingFileHandler(
+        f'logs/{config.LOG_FILE}',
+        maxBytes=config.LOG_MAX_BYTES,
+        backupCount=config.LOG_BACKUP_COUNT
+    )
+    file_handler.setFormatter(JsonFormatter() if config.LOG_JSON else logging.Formatter(config.LOG_FORMAT))
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(JsonFormatter() if config.LOG_CONSOLE_JSON else logging.Formatter(config.LOG_FORMAT))
+
+    configure_logging(
+        getattr(logging, config.LOG_LEVEL),
+        [file_handler, console_handler],
+        maxsize=config.LOG_QUEUE_SIZE,
+        sample_every=config.LOG_SAMPLE_EVERY
     )
-    return logging.getLogger(__name__)
+    return logger
 
-logger = setup_logging()
+def init_app_database():
+    """
+    Create/migrate the schema and backfill derived data.
 
-# Initialize database
-<<<<<<< HEAD
-try:
+    Run once per deployment rather than in every worker: `flask init-db`,
+    the gunicorn on_starting hook, or (as a fallback) the first request of
+    a process that finds the schema out of date.
+    """
     init_database()
+    backfilled = Analysis.backfill_sections()
+    if backfilled:
+        logger.info("Parsed sections for %s existing analyses", backfilled)
+    indexed = Entity.backfill()
+    if indexed:
+        logger.info("Indexed companies mentioned in %s existing analyses/articles", indexed)
     db_status = test_db()
     logger.info(f"Database status: {db_status}")
-except Exception as e:
-    logger.error(f"Database initialization failed: {str(e)}")
-    # Continue without database for now
-=======
-init_database()
-db_status = test_db()
-logger.info(f"Database status: {db_status}")
->>>>>>> 80b4af1a639f50148534b7d9d0c486a88f307bdb
+
+_started_pid = None
+_started_lock = threading.Lock()
+
+def _process_startup():
+    """Per-process setup, deferred to the first request so it runs after fork."""
+    global _started_pid
+    if _started_pid == os.getpid():
+        return
+    with _started_lock:
+        if _started_pid == os.getpid():
+            return
+        try:
+            if not schema_is_current():
+                init_app_database()
+        except Exception as e:
+            logger.error("Database initialization failed: %s", e)
+            # Continue without database for now
+        # Pick up queued jobs and jobs interrupted by a restart
+        job_runner.start()
+        _started_pid = os.getpid()
+
+def create_app(config=None):
+    """Build the Flask app. Cheap: no database work or heavy imports happen here."""
+    config = config or get_config()
+    setup_logging()
+    app = Flask(__name__)
+    app.config.from_object(config)
+
+    # Request/trace IDs on every log record (first, so later hooks' logs carry them)
+    init_request_ids(app)
+    app.before_request(_process_startup)
+    # Return pooled DB connections in a clean state after every request
+    app.teardown_appcontext(reset_db_connection)
+    # ETags, Cache-Control and compression for JSON responses
+    init_http_cache(app)
+    # Rate limits and concurrency caps for expensive endpoints
+    init_admission(app)
+
+    # Shared analyzer/scraper instances
+    init_services(app)
+
+    app.register_blueprint(bp)
+    logger.info('Competitive Agent Server configured for port %s', config.PORT)
+    return app
 
 # Error handlers
-@app.errorhandler(404)
+@bp.app_errorhandler(404)
 def not_found_error(error):
     logger.error(f'Page not found: {request.url}')
     return jsonify({
@@ -76,7 +137,7 @@ def not_found_error(error):
         'message': 'The requested resource was not found'
     }), 404
 
-@app.errorhandler(500)
+@bp.app_errorhandler(500)
 def internal_error(error):
     logger.error(f'Server Error: {error}')
     return jsonify({
@@ -85,30 +146,18 @@ def internal_error(error):
     }), 500
 
 # Routes
-@app.route('/')
+@bp.route('/')
 def home():
-<<<<<<< HEAD
     """Dashboard home page route."""
     logger.info('Dashboard accessed')
     return render_template('dashboard.html')
 
-@app.route('/dashboard')
+@bp.route('/dashboard')
 def dashboard():
     """Redirect to home for backward compatibility."""
-=======
-    """Home page route."""
-    logger.info('Home page accessed')
-    return jsonify({
-        "message": "Competitive Analysis Agent",
-        "status": "running"
-    })
-
-@app.route('/dashboard')
-def dashboard():
->>>>>>> 80b4af1a639f50148534b7d9d0c486a88f307bdb
     return render_template('dashboard.html')
 
-@app.route('/competitor/<int:competitor_id>')
+@bp.route('/competitor/<int:competitor_id>')
 def competitor(competitor_id):
     """Display individual competitor page with analyses."""
     try:
@@ -117,23 +166,17 @@ def competitor(competitor_id):
         if not competitor:
             return "Competitor not found", 404
         
-        # Get analyses for this competitor
-        conn = get_db_connection()
-        analyses = conn.execute(
-            'SELECT * FROM analyses WHERE competitor_id = ? ORDER BY timestamp DESC',
-            (competitor_id,)
-        ).fetchall()
-        conn.close()
-        
-        # Convert sqlite3.Row objects to dictionaries
-        analyses_list = [dict(row) for row in analyses]
+        # Get the first page of analyses; the rest load on demand. Items come
+        # from the rendered-fragment cache, so only new analyses are rendered
+        page, next_cursor = Analysis.list_by_competitor(competitor_id, fields=['id'])
+        analyses_html = render_analysis_list([a['id'] for a in page])
         
-        return render_template('competitor.html', competitor=competitor, analyses=analyses_list)
+        return render_template('competitor.html', competitor=competitor, analyses_html=analyses_html, next_cursor=next_cursor)
     except Exception as e:
         logger.error(f'Error loading competitor page {competitor_id}: {str(e)}')
         return "Error loading competitor page", 500
 
-@app.route('/api/analyze')
+@bp.route('/api/analyze')
 def analyze():
     """Analysis endpoint."""
     logger.info('Analysis endpoint accessed')
@@ -142,11 +185,11 @@ def analyze():
         "status": "ready"
     })
 
-@app.route('/routes')
+@bp.route('/routes')
 def list_routes():
     """List all available routes."""
     output = []
-    for rule in app.url_map.iter_rules():
+    for rule in current_app.url_map.iter_rules():
         if rule.methods:
             methods = ','.join(sorted(set(rule.methods) - {'HEAD', 'OPTIONS'}))
         else:
@@ -156,19 +199,19 @@ def list_routes():
     return jsonify({"routes": output})
 
 # Test Routes
-@app.route('/api/competitors')
+@bp.route('/api/competitors')
 def get_competitors():
     """Get all competitors."""
     logger.info('Competitors list requested')
     return jsonify({"competitors": Competitor.get_all()})
 
-@app.route('/api/test-data')
+@bp.route('/api/test-data')
 def create_test_data():
     """Create test data in the database."""
     logger.info('Creating test data')
     try:
         # Create a test competitor
-        competitor_id = Competitor.create("OpenAI", "https://openai.com")
+        competitor_id = Competitor.get_or_create("OpenAI", "https://openai.com")
         
         # Create a test analysis
         Analysis.create(
@@ -188,10 +231,15 @@ def create_test_data():
             "message": str(e)
         }), 500
 
-@app.route('/api/competitor/<int:competitor_id>/analyses')
+@bp.route('/api/competitor/<int:competitor_id>/analyses')
 def get_competitor_analyses(competitor_id):
-    """Get all analyses for a specific competitor."""
-    logger.info(f'Fetching analyses for competitor {competitor_id}')
+    """
+    Get a page of analyses for a specific competitor.
+
+    Query params: limit (capped), cursor (next_cursor of the previous page)
+    and fields (comma-separated; raw `content` is only returned if asked for).
+    """
+    logger.info('Fetching analyses for competitor %s', competitor_id)
     try:
         # First check if competitor exists
         competitor = Competitor.get_by_id(competitor_id)
@@ -203,16 +251,24 @@ def get_competitor_analyses(competitor_id):
             }), 404
 
         # Get analyses
-        conn = get_db_connection()
-        analyses = conn.execute(
-            'SELECT * FROM analyses WHERE competitor_id = ? ORDER BY timestamp DESC',
-            (competitor_id,)
-        ).fetchall()
-        conn.close()
+        fields = request.args.get('fields')
+        try:
+            analyses, next_cursor = Analysis.list_by_competitor(
+                competitor_id,
+                limit=request.args.get('limit', type=int),
+                cursor=request.args.get('cursor'),
+                fields=[f.strip() for f in fields.split(',') if f.strip()] if fields else None
+            )
+        except ValueError as e:
+            return jsonify({
+                'error': 'Bad Request',
+                'message': str(e)
+            }), 400
 
         return jsonify({
             "competitor": competitor,
-            "analyses": [dict(row) for row in analyses]
+            "analyses": analyses,
+            "next_cursor": next_cursor
         })
     except Exception as e:
         logger.error(f'Error fetching analyses for competitor {competitor_id}: {str(e)}')
@@ -221,21 +277,158 @@ def get_competitor_analyses(competitor_id):
             'message': str(e)
         }), 500
 
-@app.route('/api/ai-test')
+@bp.route('/api/sections/<path:section>')
+def get_section_entries(section):
+    """Get one analysis section across competitors, e.g. /api/sections/investment activity?days=7."""
+    logger.info('Fetching section %s', section)
+    try:
+        days = request.args.get('days', type=int)
+        limit = min(request.args.get('limit', 100, type=int), 500)
+        return jsonify({
+            "section": section.upper(),
+            "entries": Analysis.get_by_section(section, days=days, limit=limit)
+        })
+    except Exception as e:
+        logger.error('Error fetching section %s: %s', section, e)
+        return jsonify({
+            'error': 'Internal Server Error',
+            'message': str(e)
+        }), 500
+
+@bp.route('/api/search')
+def search():
+    """
+    Ranked full-text search over past analyses and scraped articles.
+
+    Query params: q (required), type (all|analyses|articles), limit, offset.
+    """
+    query = request.args.get('q', '').strip()
+    search_type = request.args.get('type', 'all')
+    limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+    offset = max(0, request.args.get('offset', 0, type=int))
+    logger.info('Search requested: %r (%s)', query, search_type)
+    if not query or search_type not in ('all', 'analyses', 'articles'):
+        return jsonify({
+            'error': 'Bad Request',
+            'message': 'Provide q and a type of all, analyses or articles'
+        }), 400
+    try:
+        results = {"query": query, "limit": limit, "offset": offset}
+        if search_type in ('all', 'analyses'):
+            results["analyses"] = Analysis.search(query, limit=limit, offset=offset)
+        if search_type in ('all', 'articles'):
+            results["articles"] = Article.search(query, limit=limit, offset=offset)
+        return jsonify(results)
+    except ValueError as e:
+        return jsonify({
+            'error': 'Bad Request',
+            'message': str(e)
+        }), 400
+    except NotImplementedError as e:
+        return jsonify({
+            'error': 'Not Implemented',
+            'message': str(e)
+        }), 501
+    except Exception as e:
+        logger.error('Search error for %r: %s', query, e)
+        return jsonify({
+            'error': 'Internal Server Error',
+            'message': str(e)
+        }), 500
+
+@bp.route('/api/stats')
+def get_stats():
+    """Dashboard counters read from the incrementally maintained rollup tables."""
+    logger.info('Stats requested')
+    try:
+        days = max(1, min(request.args.get('days', 14, type=int), 365))
+        return jsonify(Stats.summary(days=days))
+    except Exception as e:
+        logger.error('Error fetching stats: %s', e)
+        return jsonify({
+            'error': 'Internal Server Error',
+            'message': str(e)
+        }), 500
+
+@bp.route('/api/trends')
+def get_trends():
+    """
+    Week-over-week keyword-category and company trends.
+
+    Query params: weeks (number of weeks to report, default
+    TRENDS_DEFAULT_WEEKS). Reports are cached for TRENDS_CACHE_TTL seconds.
+    """
+    logger.info('Trends requested')
+    try:
+        from trends import get_trends as build_trends  # Heavy (pandas); imported on first use
+        return jsonify(build_trends(weeks=request.args.get('weeks', type=int)))
+    except Exception as e:
+        logger.error('Error computing trends: %s', e)
+        return jsonify({
+            'error': 'Internal Server Error',
+            'message': str(e)
+        }), 500
+
+@bp.route('/api/entities/top')
+def top_entities():
+    """Most-mentioned companies over a period, e.g. /api/entities/top?days=7&limit=20."""
+    logger.info('Top entities requested')
+    try:
+        days = max(1, min(request.args.get('days', 7, type=int), 365))
+        limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+        return jsonify({"days": days, "entities": Entity.top(days=days, limit=limit)})
+    except Exception as e:
+        logger.error('Error fetching top entities: %s', e)
+        return jsonify({
+            'error': 'Internal Server Error',
+            'message': str(e)
+        }), 500
+
+@bp.route('/api/entities/<path:name>/mentions')
+def entity_mentions(name):
+    """Where a company has shown up: analyses and articles, newest first, cursor-paginated."""
+    logger.info('Mentions requested for entity %s', name)
+    try:
+        entity = Entity.get_by_name(name)
+        if not entity:
+            return jsonify({
+                'error': 'Not Found',
+                'message': f'No mentions of {name} found'
+            }), 404
+        try:
+            mentions, next_cursor = Entity.get_mentions(
+                entity['id'],
+                limit=request.args.get('limit', type=int),
+                cursor=request.args.get('cursor')
+            )
+        except ValueError as e:
+            return jsonify({
+                'error': 'Bad Request',
+                'message': str(e)
+            }), 400
+        return jsonify({"entity": entity, "mentions": mentions, "next_cursor": next_cursor})
+    except Exception as e:
+        logger.error('Error fetching mentions for %s: %s', name, e)
+        return jsonify({
+            'error': 'Internal Server Error',
+            'message': str(e)
+        }), 500
+
+@bp.route('/api/ai-test')
 def ai_test():
-    analyzer = CompetitiveAnalyzer()
+    analyzer = services.analyzer()
     return analyzer.test_connection()
 
-@app.route('/api/test-analysis')
+@bp.route('/api/test-analysis')
 def test_analysis():
-    analyzer = CompetitiveAnalyzer()
+    analyzer = services.analyzer()
     result = analyzer.analyze_content(
         "OpenAI launched GPT-5 with breakthrough capabilities", 
         "OpenAI"
     )
     return {"analysis": result}
 
-@app.route('/api/analyze', methods=['POST'])
+@bp.route('/api/analyze', methods=['POST'])
 def analyze_competitor_content():
     try:
         data = request.get_json()
@@ -246,34 +439,57 @@ def analyze_competitor_content():
             return {"error": "Missing competitor_name or content"}, 400
         
         # Get or create competitor
-        competitors = Competitor.get_all()
-        competitor = next((c for c in competitors if c['name'] == competitor_name), None)
-        
-        if not competitor:
-            competitor_id = Competitor.create(competitor_name, "manual-entry")
-        else:
-            competitor_id = competitor['id']
+        competitor_id = Competitor.get_or_create(competitor_name, "manual-entry")
         
         # Analyze content
-        analyzer = CompetitiveAnalyzer()
+        analyzer = services.analyzer()
         analysis_result = analyzer.analyze_content(content, competitor_name)
         
-        # Save analysis to database
-        Analysis.create(competitor_id, content, analysis_result)
+        # Save analysis to database (group-committed in the background)
+        Analysis.create(competitor_id, content, analysis_result, defer=True)
         
         return {
             "status": "success",
             "competitor": competitor_name,
-            "analysis": analysis_result
+            "analysis": analysis_result,
+            "sections": parse_analysis_sections(analysis_result)
         }
         
     except Exception as e:
         logger.error(f'Error in analyze_competitor_content: {str(e)}')
         return {"error": str(e)}, 500
 
-@app.route('/api/test-scrape')
+@bp.route('/api/analyze/batch', methods=['POST'])
+def analyze_batch_content():
+    """
+    Analyze many items in one request.
+
+    Body: {"items": [{"competitor_name": ..., "content": ...}, ...]}
+    Duplicates are analyzed once, cache hits are served without an LLM call,
+    and new analyses are stored in a single transaction.
+    """
+    data = request.get_json(silent=True) or {}
+    items = data.get('items')
+    try:
+        validate_batch(items)
+    except ValueError as e:
+        return jsonify({
+            'error': 'Bad Request',
+            'message': str(e)
+        }), 400
+    logger.info('Batch analysis requested for %d items', len(items))
+    try:
+        return jsonify(analyze_batch(items, services.analyzer()))
+    except Exception as e:
+        logger.error('Error in analyze_batch_content: %s', e)
+        return jsonify({
+            'error': 'Internal Server Error',
+            'message': str(e)
+        }), 500
+
+@bp.route('/api/test-scrape')
 def test_scrape():
-    scraper = CompetitiveScraper()
+    scraper = services.scraper()
     # Fetch the raw RSS feed content for debugging
     feed_url = scraper.sources['techcrunch_main']
     headers = {
@@ -283,15 +499,16 @@ def test_scrape():
         'Cache-Control': 'no-cache',
         'Pragma': 'no-cache'
     }
+    import requests
     response = requests.get(feed_url, headers=headers, timeout=10)
     raw_xml = response.text
     articles = scraper.scrape_rss_feed('techcrunch_main', max_articles=3)
     return {"articles": articles, "raw_xml": raw_xml[:2000]}  # Return first 2000 chars for brevity
 
-@app.route('/api/scrape-and-analyze')
+@bp.route('/api/scrape-and-analyze')
 def scrape_and_analyze():
-    scraper = CompetitiveScraper()
-    analyzer = CompetitiveAnalyzer()
+    scraper = services.scraper()
+    analyzer = services.analyzer()
     # Scrape fresh articles
     articles = scraper.scrape_rss_feed('techcrunch_main', max_articles=3)
     analyses = []
@@ -306,36 +523,41 @@ def scrape_and_analyze():
     return {"analyses": analyses}
 
 # Check if 'venturebeat' is in sources, otherwise comment out the route
-# @app.route('/api/test-venturebeat')
+# @bp.route('/api/test-venturebeat')
 # def test_venturebeat():
-#     scraper = CompetitiveScraper()
+#     scraper = services.scraper()
 #     articles = scraper.scrape_rss_feed('venturebeat', max_articles=3)
 #     return {"articles": articles}
 
-@app.route('/api/test-propmodo')
+@bp.route('/api/test-propmodo')
 def test_propmodo():
-    scraper = CompetitiveScraper()
+    scraper = services.scraper()
     articles = scraper.scrape_propmodo(max_articles=3)
     return {"articles": articles}
 
-@app.route('/api/test-all-sources')
+@bp.route('/api/test-all-sources')
 def test_all_sources():
-    scraper = CompetitiveScraper()
+    scraper = services.scraper()
     articles = asyncio.run(scraper._scrape_all_sources_async(max_articles_per_source=3))
     return {"articles": articles}
 
-@app.route('/api/full-competitive-analysis', methods=['GET'])
+@bp.route('/api/full-competitive-analysis', methods=['GET'])
 def full_competitive_analysis():
-    """Endpoint for full competitive analysis of all sources."""
+    """
+    Endpoint for full competitive analysis of all sources.
+
+    Runs inside the request; prefer POST /api/jobs with kind
+    'full-competitive-analysis' for real runs.
+    """
     try:
-        scraper = CompetitiveScraper()
-        analyzer = CompetitiveAnalyzer()
+        scraper = services.scraper()
+        analyzer = services.analyzer()
         # Get articles from all sources
         articles = scraper.scrape_all_sources(max_articles_per_source=5)
         # Analyze each article
         analysis_results = []
         for article in articles:
-            analysis = analyzer.analyze_content(article['content'])
+            analysis = analyzer.analyze_content(article['content'], article.get('source', 'Unknown'))
             if analysis:
                 analysis_results.append({
                     'article': article,
@@ -355,145 +577,164 @@ def full_competitive_analysis():
             'message': str(e)
         }), 500
 
-@app.route('/api/proptech-articles')
+@bp.route('/api/jobs', methods=['POST'])
+def create_job():
+    """
+    Enqueue a background job.
+
+    Body: {"kind": "full-competitive-analysis", "params": {"max_articles_per_source": 5}}
+    """
+    data = request.get_json(silent=True) or {}
+    kind = data.get('kind', 'full-competitive-analysis')
+    params = data.get('params') or {}
+    logger.info('Job requested: %s', kind)
+    try:
+        if not isinstance(params, dict):
+            raise ValueError("params must be an object")
+        job_id = Job.create(kind, params)
+    except ValueError as e:
+        return jsonify({
+            'error': 'Bad Request',
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        logger.error('Error creating job: %s', e)
+        return jsonify({
+            'error': 'Internal Server Error',
+            'message': 'Failed to create job'
+        }), 500
+    job_runner.submit(job_id)
+    return jsonify({"job_id": job_id, "status": "queued", "status_url": f"/api/jobs/{job_id}"}), 202
+
+@bp.route('/api/jobs/<int:job_id>')
+def get_job(job_id):
+    """Job status, progress and the results finished so far."""
+    try:
+        job = Job.get(job_id)
+        if job is None:
+            return jsonify({
+                'error': 'Not Found',
+                'message': f'Job {job_id} not found'
+            }), 404
+        return jsonify(job)
+    except Exception as e:
+        logger.error('Error fetching job %s: %s', job_id, e)
+        return jsonify({
+            'error': 'Internal Server Error',
+            'message': 'Failed to fetch job'
+        }), 500
+
+@bp.route('/api/proptech-articles')
 def proptech_articles():
-    scraper = CompetitiveScraper()
+    scraper = services.scraper()
     articles = scraper.scrape_proptech_articles(max_articles=10)
     return {"articles": articles}
 
-@app.route('/api/proptech-intelligence')
+@bp.route('/api/proptech-intelligence')
 def proptech_intelligence():
-<<<<<<< HEAD
-    """Advanced PropTech intelligence with real-time analysis."""
+    """
+    Advanced PropTech intelligence with AI analysis.
+
+    Served from a snapshot; once it is older than INTELLIGENCE_SNAPSHOT_TTL a
+    single background refresh re-runs the scrape and analysis.
+    """
     try:
-        scraper = CompetitiveScraper()
-        articles = scraper.scrape_proptech_articles(max_articles=10)
-        
-        if not articles:
-            return jsonify({"message": "No PropTech articles found", "intelligence": []})
-        
-        # Try to initialize analyzer and perform AI analysis
-        try:
-            analyzer = CompetitiveAnalyzer()
-            logger.info("CompetitiveAnalyzer initialized successfully")
-            
-            intel_results = []
-            for article in articles[:5]:  # Limit to 5 for performance
-                try:
-                    content = f"Title: {article.get('title', '')}\nContent: {article.get('content', '')}"
-                    
-                    # Check cache first
-                    cached_summary = get_cached_summary(content, article.get('source', 'Unknown'))
-                    
-                    if cached_summary:
-                        analysis = cached_summary
-                        cached = True
-                        logger.info(f"Using cached analysis for: {article.get('title', '')[:50]}")
-                    else:
-                        # Perform AI analysis
-                        analysis = analyzer.analyze_content(content, article.get('source', 'Unknown'))
-                        set_cached_summary(content, article.get('source', 'Unknown'), analysis)
-                        cached = False
-                        logger.info(f"Generated new analysis for: {article.get('title', '')[:50]}")
-                    
-                    intel_results.append({
-                        "title": article.get('title', ''),
-                        "source": article.get('source', ''),
-                        "url": article.get('url', ''),
-                        "published": article.get('published', ''),
-                        "summary": analysis,
-                        "cached": cached
-                    })
-                except Exception as e:
-                    logger.error(f'Error analyzing article {article.get("title", "")}: {str(e)}')
-                    intel_results.append({
-                        "title": article.get('title', ''),
-                        "source": article.get('source', ''),
-                        "url": article.get('url', ''),
-                        "published": article.get('published', ''),
-                        "summary": f"Analysis failed: {str(e)}",
-                        "cached": False
-                    })
-            
-            return jsonify({
-                "total_articles_found": len(articles),
-                "analyses_completed": len(intel_results),
-                "intelligence": intel_results,
-                "timestamp": time.time(),
-                "note": "AI-powered competitive intelligence analysis"
-            })
-            
-        except Exception as e:
-            logger.error(f"Could not initialize analyzer: {str(e)}")
-            # Fallback to basic article display
-            intel_results = []
-            for article in articles[:8]:
-                intel_results.append({
-                    "title": article.get('title', ''),
-                    "source": article.get('source', ''),
-                    "url": article.get('url', ''),
-                    "published": article.get('published', ''),
-                    "summary": f"**Source:** {article.get('source', 'Unknown')}\n\n**Content Preview:** {article.get('content', '')[:200]}...\n\n**Note:** AI analysis unavailable - {str(e)}",
-                    "cached": False
-                })
-            
-            return jsonify({
-                "total_articles_found": len(articles),
-                "analyses_completed": len(intel_results),
-                "intelligence": intel_results,
-                "timestamp": time.time(),
-                "note": f"AI analysis temporarily unavailable: {str(e)}"
-            })
-        
+        payload, snapshot = intelligence_snapshot.get()
+        return jsonify({**payload, "snapshot": snapshot})
+    except SnapshotNotReady as e:
+        response = jsonify({
+            'error': 'Service Unavailable',
+            'message': str(e)
+        })
+        response.status_code = 503
+        response.headers['Retry-After'] = '30'
+        return response
     except Exception as e:
         logger.error(f'PropTech intelligence error: {str(e)}')
         return jsonify({"error": str(e)}), 500
-=======
-    scraper = CompetitiveScraper()
-    analyzer = CompetitiveAnalyzer()
-    articles = scraper.scrape_proptech_articles(max_articles=10)
 
-    async def analyze_article_async(article):
-        content = article.get('content', '')
-        if not content:
-            return None
-        try:
-            loop = asyncio.get_event_loop()
-            # Run analyze_content in a thread to avoid blocking
-            summary = await loop.run_in_executor(
-                None, analyzer.analyze_content, content, article.get('source', '')
-            )
-            return {
-                'title': article.get('title', ''),
-                'source': article.get('source', ''),
-                'link': article.get('link', article.get('url', '')),
-                'proptech_analysis': summary or ''
-            }
-        except Exception as e:
-            logger.error(f"Error analyzing article: {str(e)}")
-            return None
+@bp.route('/api/proptech-intelligence/stream')
+def proptech_intelligence_stream():
+    """
+    Streaming variant of /api/proptech-intelligence.
+
+    Responds with NDJSON (one JSON event per line) so the dashboard can render
+    each article as soon as its cached or fresh analysis is ready.
+    """
+    logger.info('Streaming PropTech intelligence')
+    return Response(
+        stream_with_context(stream_intelligence(intelligence_snapshot)),
+        mimetype='application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
 
-    async def analyze_all_articles():
-        tasks = [analyze_article_async(article) for article in articles]
-        results = await asyncio.gather(*tasks)
-        return [r for r in results if r]
+@bp.route('/api/export')
+def export_analyses_route():
+    """
+    Download stored analyses as NDJSON, CSV or Parquet.
 
-    # Run the async analysis
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    analyses = loop.run_until_complete(analyze_all_articles())
-    loop.close()
+    Query params: format (ndjson, csv or parquet; default ndjson),
+    competitor_id and since (timestamp lower bound). The body is streamed
+    batch by batch with chunked transfer, so exports of any size run in
+    constant memory.
+    """
+    fmt = request.args.get('format', 'ndjson').lower()
+    competitor_id = request.args.get('competitor_id', type=int)
+    since = request.args.get('since')
+    logger.info('Exporting analyses as %s (competitor=%s, since=%s)', fmt, competitor_id, since)
+    try:
+        validate_format(fmt)
+    except ValueError as e:
+        return jsonify({
+            'error': 'Bad Request',
+            'message': str(e)
+        }), 400
+
+    return Response(
+        stream_with_context(export_analyses(fmt, competitor_id=competitor_id, since=since)),
+        mimetype=EXPORT_FORMATS[fmt]['mimetype'],
+        headers={
+            'Content-Disposition': f"attachment; filename=analyses.{EXPORT_FORMATS[fmt]['extension']}",
+            'Cache-Control': 'no-store',
+            'X-Accel-Buffering': 'no'
+        }
+    )
 
-    return {
-        "proptech_focus": True,
-        "total_articles_found": len(analyses),
-        "analyses": analyses
-    }
->>>>>>> 80b4af1a639f50148534b7d9d0c486a88f307bdb
+@bp.route('/api/intelligence/feed')
+def intelligence_feed():
+    """
+    A page of stored PropTech intelligence for the dashboard's infinite scroll.
 
-@app.route('/api/debug-proptech-filter')
+    Query params: limit (capped), cursor (next_cursor of the previous page)
+    and source. Summaries come pre-parsed into sections.
+    """
+    logger.info('Intelligence feed requested (cursor=%s)', request.args.get('cursor'))
+    try:
+        try:
+            articles, next_cursor = Article.list_feed(
+                limit=request.args.get('limit', type=int),
+                cursor=request.args.get('cursor'),
+                source=request.args.get('source')
+            )
+        except ValueError as e:
+            return jsonify({
+                'error': 'Bad Request',
+                'message': str(e)
+            }), 400
+        return jsonify({
+            "articles": articles,
+            "next_cursor": next_cursor
+        })
+    except Exception as e:
+        logger.error('Error fetching intelligence feed: %s', e)
+        return jsonify({
+            'error': 'Internal Server Error',
+            'message': str(e)
+        }), 500
+
+@bp.route('/api/debug-proptech-filter')
 def debug_proptech_filter():
-    scraper = CompetitiveScraper()
+    scraper = services.scraper()
     
     # Get all articles first
     all_articles = asyncio.run(scraper._scrape_all_sources_async(max_articles_per_source=3))
@@ -516,33 +757,40 @@ def debug_proptech_filter():
         "debug_info": debug_info
     }
 
-def main():
-    """
-    Main function that serves as the entry point for the application.
-    """
-    config = get_config()
-    
-<<<<<<< HEAD
-    # Always return the app for Gunicorn to use
-    logger.info(f'Competitive Agent Server configured for port {config.PORT}')
-    return app
-
-# For Gunicorn deployment
-app = main()
+@bp.cli.command('archive-analyses')
+@click.option('--days', type=int, default=None, help='Archive analyses older than this (default: Config.ARCHIVE_AFTER_DAYS)')
+def archive_analyses_command(days):
+    """Move old analyses into compressed cold storage."""
+    archived = archive_old_analyses(max_age_days=days)
+    click.echo(f"Archived {archived} analyses")
+
+@bp.cli.command('export')
+@click.option('--format', 'fmt', type=click.Choice(list(EXPORT_FORMATS)), default='ndjson', show_default=True)
+@click.option('--output', '-o', type=click.Path(dir_okay=False), default='-', help='Output file (default: stdout)')
+@click.option('--competitor-id', type=int, default=None, help="Only export this competitor's analyses")
+@click.option('--since', default=None, help='Only export analyses with timestamp >= this')
+@click.option('--batch-size', type=int, default=None, help='Rows per batch (default: Config.EXPORT_BATCH_SIZE)')
+def export_command(fmt, output, competitor_id, since, batch_size):
+    """Stream stored analyses to a file as NDJSON, CSV or Parquet."""
+    try:
+        validate_format(fmt)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    with click.open_file(output, 'wb') as out:
+        for chunk in export_analyses(fmt, competitor_id=competitor_id, since=since, batch_size=batch_size):
+            out.write(chunk)
+    if output != '-':
+        click.echo(f"Exported analyses to {output}")
+
+@bp.cli.command('init-db')
+def init_db_command():
+    """Create or migrate the database schema (run once per deploy)."""
+    init_app_database()
+    click.echo("Database initialized")
 
 if __name__ == "__main__":
     # For direct execution
     config = get_config()
-    app.run(host='0.0.0.0', port=config.PORT, debug=config.DEBUG) 
-=======
-    # Check if we're running in production (Gunicorn)
-    if os.environ.get('PRODUCTION'):
-        return app
-    else:
-        # Development server with debug mode enabled
-        logger.info(f'Starting Competitive Agent Server in development mode on port {config.PORT}')
-        app.run(host='0.0.0.0', port=config.PORT, debug=config.DEBUG)
-
-if __name__ == "__main__":
-    main() 
->>>>>>> 80b4af1a639f50148534b7d9d0c486a88f307bdb
+    app = create_app(config)
+    init_app_database()
+    app.run(host='0.0.0.0', port=config.PORT, debug=config.DEBUG)
@@ -2,24 +2,190 @@
 Data models and utility functions for the Competitive Agent application.
 """
 
-from database import get_db_connection
-from datetime import datetime
+import re
+import base64
+import threading
+from collections import OrderedDict
+from database import get_db_connection, defer_write, get_content_hash, get_dialect, begin_transaction
+from archive import load_archived
+from config import Config
+from datetime import datetime, timedelta
+
+# Columns that analysis listings may project; raw content stays opt-in
+ANALYSIS_FIELDS = {
+    'id': 'id',
+    'competitor_id': 'competitor_id',
+    'timestamp': 'timestamp',
+    'analysis': 'analysis',
+    'content': 'content',
+    'content_preview': 'substr(content, 1, 280) AS content_preview',
+}
+DEFAULT_ANALYSIS_LIST_FIELDS = ('id', 'competitor_id', 'timestamp', 'content_preview', 'sections')
+
+def _analysis_columns(fields):
+    """Build the SELECT list for the requested analysis fields (id and timestamp always included)."""
+    unknown = set(fields) - set(ANALYSIS_FIELDS) - {'sections'}
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    names = ['id', 'timestamp'] + [f for f in fields if f in ANALYSIS_FIELDS and f not in ('id', 'timestamp')]
+    return ', '.join([ANALYSIS_FIELDS[name] for name in names] + ['archived'])
+
+def encode_cursor(timestamp, row_id):
+    """Encode a (timestamp, id) keyset position as an opaque cursor."""
+    return base64.urlsafe_b64encode(f"{timestamp}|{row_id}".encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor):
+    """Decode a cursor from encode_cursor(), raising ValueError if it is malformed."""
+    try:
+        timestamp, row_id = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').rsplit('|', 1)
+        return timestamp, int(row_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def parse_analysis_sections(analysis_text):
+    """
+    Split a `**SECTION:**` formatted analysis into structured sections.
+
+    Mirrors the splitting the dashboard used to do client-side: labels and
+    bodies alternate after splitting on `**`, and empty or template
+    placeholder bodies (starting with '[') are dropped.
+
+    Returns:
+        list: [{"section": "TECH INNOVATIONS", "body": "..."}, ...]
+    """
+    if not analysis_text:
+        return []
+    parts = analysis_text.split('**')
+    sections = []
+    for i in range(1, len(parts) - 1, 2):
+        label = parts[i].strip().rstrip(':').strip().upper()
+        body = parts[i + 1].strip()
+        if label and body and not body.startswith('['):
+            sections.append({"section": label, "body": body})
+    return sections
+
+# Corporate suffixes folded away when matching company names
+ENTITY_SUFFIXES = {
+    'inc', 'incorporated', 'llc', 'ltd', 'limited', 'corp', 'corporation',
+    'co', 'company', 'group', 'holdings', 'plc', 'gmbh', 'sa', 'ag', 'lp'
+}
+ENTITY_PLACEHOLDERS = {'none', 'n/a', 'na', 'not mentioned', 'no companies mentioned', 'unknown'}
+
+def normalize_entity_name(name):
+    """
+    Fold a company name to its matching key, e.g. "Zillow Group, Inc." -> "zillow".
+
+    Lowercases, drops punctuation, a leading "the" and trailing corporate
+    suffixes. Returns '' for names that are empty or placeholders.
+    """
+    if name.strip().lower().rstrip('.') in ENTITY_PLACEHOLDERS:
+        return ''
+    words = re.sub(r"[^\w&+ ]+", ' ', name.lower()).split()
+    if words and words[0] == 'the' and len(words) > 1:
+        words = words[1:]
+    while len(words) > 1 and words[-1] in ENTITY_SUFFIXES:
+        words = words[:-1]
+    return ' '.join(words)
+
+def is_entity_suffix(name):
+    """True for a bare corporate suffix such as "Inc." or "LLC"."""
+    words = re.sub(r"[^\w&+ ]+", ' ', name.lower()).split()
+    return bool(words) and all(word in ENTITY_SUFFIXES for word in words)
+
+def split_entity_list(text):
+    """
+    Split a COMPANIES MENTIONED body into clean display names.
+
+    A part that is only a corporate suffix ("Zillow Group, Inc., Redfin")
+    is joined back onto the name before it rather than becoming a company.
+    """
+    names = []
+    for part in re.split(r'[,;\n]', text or ''):
+        name = part.strip().lstrip(':-*\u2022 ').rstrip('.').strip()
+        if not name:
+            continue
+        if is_entity_suffix(name):
+            if names:
+                names[-1] = f'{names[-1]}, {name}'
+            continue
+        if normalize_entity_name(name):
+            names.append(name)
+    return names
+
+def fts_query(text):
+    """
+    Turn free text into a safe FTS5 MATCH expression.
+
+    Each whitespace-separated term is quoted (so punctuation can't break the
+    query syntax) and terms are ANDed; a trailing * keeps prefix matching.
+    """
+    terms = []
+    for term in text.split():
+        prefix = term.endswith('*')
+        term = term.rstrip('*').replace('"', '""')
+        if term:
+            terms.append(f'"{term}"' + ('*' if prefix else ''))
+    if not terms:
+        raise ValueError("Search query must contain at least one term")
+    if get_dialect() != 'sqlite':
+        raise NotImplementedError("Full-text search requires the SQLite (FTS5) backend")
+    return ' '.join(terms)
 
 class Competitor:
     """Competitor model for managing competitor data."""
+
+    # In-process LRU of name -> id (COMPETITOR_ID_CACHE_SIZE entries); cleared on every competitor write
+    _id_cache = OrderedDict()
+    _id_cache_lock = threading.Lock()
     
     @staticmethod
     def create(name, website):
         """Create a new competitor."""
         conn = get_db_connection()
+        competitor_id = conn.execute(
+            'INSERT INTO competitors (name, website) VALUES (?, ?) RETURNING id',
+            (name, website)
+        ).fetchone()['id']
+        conn.commit()
+        conn.close()
+        Competitor.invalidate_cache()
+        return competitor_id
+
+    @staticmethod
+    def get_or_create(name, website):
+        """
+        Get a competitor id by name, creating the competitor if needed.
+
+        Relies on the unique index on competitors.name, so concurrent callers
+        can never create the same competitor twice.
+        """
+        with Competitor._id_cache_lock:
+            competitor_id = Competitor._id_cache.get(name)
+            if competitor_id is not None:
+                Competitor._id_cache.move_to_end(name)
+                return competitor_id
+        conn = get_db_connection()
         cursor = conn.execute(
-            'INSERT INTO competitors (name, website) VALUES (?, ?)',
+            'INSERT INTO competitors (name, website) VALUES (?, ?) ON CONFLICT (name) DO NOTHING',
             (name, website)
         )
-        competitor_id = cursor.lastrowid
+        created = cursor.rowcount > 0
+        row = conn.execute('SELECT id FROM competitors WHERE name = ?', (name,)).fetchone()
         conn.commit()
         conn.close()
-        return competitor_id
+        if created:
+            Competitor.invalidate_cache()
+        with Competitor._id_cache_lock:
+            Competitor._id_cache[name] = row['id']
+            if len(Competitor._id_cache) > Config.COMPETITOR_ID_CACHE_SIZE:
+                Competitor._id_cache.popitem(last=False)
+        return row['id']
+
+    @staticmethod
+    def invalidate_cache():
+        """Forget cached name -> id lookups after a competitor write."""
+        with Competitor._id_cache_lock:
+            Competitor._id_cache.clear()
     
     @staticmethod
     def get_all():
@@ -43,17 +209,151 @@ class Analysis:
     """Analysis model for managing analysis data."""
     
     @staticmethod
-    def create(competitor_id, content, analysis):
-        """Create a new analysis."""
+    def create(competitor_id, content, analysis, defer=False):
+        """
+        Create a new analysis and store its parsed sections.
+
+        With defer=True the insert is queued for the write-behind thread and
+        None is returned instead of the new id; call database.flush_writes()
+        when a later read must see it.
+        """
+        if defer:
+            defer_write(lambda conn: Analysis._insert(conn, competitor_id, content, analysis))
+            return None
         conn = get_db_connection()
-        cursor = conn.execute(
-            'INSERT INTO analyses (competitor_id, content, analysis) VALUES (?, ?, ?)',
-            (competitor_id, content, analysis)
-        )
-        analysis_id = cursor.lastrowid
+        analysis_id = Analysis._insert(conn, competitor_id, content, analysis)
         conn.commit()
         conn.close()
         return analysis_id
+
+    @staticmethod
+    def create_many(rows):
+        """
+        Insert many (competitor_id, content, analysis) rows in one transaction.
+
+        Returns:
+            list: The new analysis ids, in input order
+        """
+        conn = get_db_connection()
+        try:
+            begin_transaction(conn)
+            ids = [Analysis._insert(conn, *row) for row in rows]
+            conn.commit()
+            return ids
+        except Exception:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _insert(conn, competitor_id, content, analysis):
+        """Insert an analysis and its sections using an open connection."""
+        inserted = conn.execute(
+            'INSERT INTO analyses (competitor_id, content, analysis, sections_parsed) VALUES (?, ?, ?, 1) '
+            'RETURNING id, timestamp',
+            (competitor_id, content, analysis)
+        ).fetchone()
+        analysis_id = inserted['id']
+        sections = Analysis._insert_sections(conn, analysis_id, analysis)
+        companies = next((s['body'] for s in sections if s['section'] == 'COMPANIES MENTIONED'), None)
+        if companies:
+            Entity.record_mentions(conn, companies, analysis_id=analysis_id, mentioned_at=inserted['timestamp'])
+        if competitor_id is not None:
+            Stats.record_analysis(conn, competitor_id)
+        return analysis_id
+
+    @staticmethod
+    def _insert_sections(conn, analysis_id, analysis):
+        """Insert the parsed sections of an analysis using an open connection; returns them."""
+        sections = parse_analysis_sections(analysis)
+        conn.executemany(
+            'INSERT INTO analysis_sections (analysis_id, position, section, body) VALUES (?, ?, ?, ?)',
+            [
+                (analysis_id, position, s['section'], s['body'])
+                for position, s in enumerate(sections)
+            ]
+        )
+        Analysis.invalidate_fragments(conn, [analysis_id])
+        return sections
+
+    @staticmethod
+    def invalidate_fragments(conn, analysis_ids):
+        """Drop cached rendered HTML for these analyses (call inside the write's transaction)."""
+        if not analysis_ids:
+            return
+        placeholders = ','.join('?' * len(analysis_ids))
+        conn.execute(f'DELETE FROM analysis_fragments WHERE analysis_id IN ({placeholders})', list(analysis_ids))
+
+    @staticmethod
+    def get_sections(analysis_ids):
+        """Get parsed sections for the given analyses, keyed by analysis id."""
+        sections = {analysis_id: [] for analysis_id in analysis_ids}
+        if not sections:
+            return sections
+        conn = get_db_connection()
+        placeholders = ','.join('?' * len(sections))
+        rows = conn.execute(
+            f'SELECT analysis_id, section, body FROM analysis_sections '
+            f'WHERE analysis_id IN ({placeholders}) ORDER BY analysis_id, position',
+            list(sections)
+        ).fetchall()
+        conn.close()
+        for row in rows:
+            sections[row['analysis_id']].append({"section": row['section'], "body": row['body']})
+        return sections
+
+    @staticmethod
+    def _unarchive(analyses):
+        """Fill in text moved to cold storage for archived rows (and drop the flag)."""
+        archived_ids = [a['id'] for a in analyses if a.pop('archived', 0)]
+        text_fields = ('content', 'analysis', 'content_preview')
+        if not archived_ids or not any(field in analyses[0] for field in text_fields):
+            return analyses
+        archived = load_archived(archived_ids)
+        for a in analyses:
+            text = archived.get(a['id'])
+            if text is None:
+                continue
+            for field in ('content', 'analysis'):
+                if field in a:
+                    a[field] = text[field]
+            if 'content_preview' in a:
+                a['content_preview'] = (text['content'] or '')[:280]
+        return analyses
+
+    @staticmethod
+    def _with_sections(analyses):
+        """
+        Attach pre-parsed sections to a list of analysis dicts.
+
+        Analyses without sections (old-format, free-text analyses) also get
+        their `analysis` text, so listings can show it instead.
+        """
+        sections = Analysis.get_sections([a['id'] for a in analyses])
+        for a in analyses:
+            a['sections'] = sections.get(a['id'], [])
+        return Analysis._with_unstructured_text(analyses)
+
+    @staticmethod
+    def _with_unstructured_text(analyses):
+        missing = [a['id'] for a in analyses if not a['sections'] and 'analysis' not in a]
+        if not missing:
+            return analyses
+        placeholders = ','.join('?' * len(missing))
+        conn = get_db_connection()
+        rows = conn.execute(
+            f'SELECT id, analysis, archived FROM analyses WHERE id IN ({placeholders})', missing
+        ).fetchall()
+        conn.close()
+        texts = {row['id']: row['analysis'] for row in rows}
+        for analysis_id, text in load_archived([row['id'] for row in rows if row['archived']]).items():
+            texts[analysis_id] = text['analysis']
+        for a in analyses:
+            if a['id'] in texts:
+                a['analysis'] = texts[a['id']]
+        return analyses
     
     @staticmethod
     def get_latest_by_competitor(competitor_id):
@@ -64,19 +364,474 @@ class Analysis:
             (competitor_id,)
         ).fetchone()
         conn.close()
-<<<<<<< HEAD
-        return dict(analysis) if analysis else None
+        if not analysis:
+            return None
+        return Analysis._with_sections(Analysis._unarchive([dict(analysis)]))[0]
     
     @staticmethod
-    def get_all_by_competitor(competitor_id):
-        """Get all analyses for a competitor."""
+    def get_many(analysis_ids, fields=None):
+        """Get analyses by id (in no particular order), projecting DEFAULT_ANALYSIS_LIST_FIELDS by default."""
+        if not analysis_ids:
+            return []
+        fields = fields or DEFAULT_ANALYSIS_LIST_FIELDS
+        placeholders = ','.join('?' * len(analysis_ids))
+        conn = get_db_connection()
+        rows = conn.execute(
+            f'SELECT {_analysis_columns(fields)} FROM analyses WHERE id IN ({placeholders})',
+            list(analysis_ids)
+        ).fetchall()
+        conn.close()
+        analyses = Analysis._unarchive([dict(row) for row in rows])
+        if 'sections' not in fields:
+            return analyses
+        return Analysis._with_sections(analyses)
+
+    @staticmethod
+    def get_all_by_competitor(competitor_id, fields=None):
+        """Get all analyses for a competitor, optionally projecting only some fields."""
+        columns = _analysis_columns(fields) if fields else '*'
         conn = get_db_connection()
         analyses = conn.execute(
-            'SELECT * FROM analyses WHERE competitor_id = ? ORDER BY timestamp DESC',
+            f'SELECT {columns} FROM analyses WHERE competitor_id = ? ORDER BY timestamp DESC, id DESC',
             (competitor_id,)
         ).fetchall()
         conn.close()
-        return [dict(row) for row in analyses] 
-=======
-        return dict(analysis) if analysis else None 
->>>>>>> 80b4af1a639f50148534b7d9d0c486a88f307bdb
+        analyses = Analysis._unarchive([dict(row) for row in analyses])
+        if fields and 'sections' not in fields:
+            return analyses
+        return Analysis._with_sections(analyses)
+
+    @staticmethod
+    def list_by_competitor(competitor_id, limit=None, cursor=None, fields=None):
+        """
+        Get one page of a competitor's analyses, newest first.
+
+        Uses keyset pagination on (timestamp, id) so every page is an index
+        range scan regardless of how much history the competitor has.
+
+        Args:
+            competitor_id: Competitor to list
+            limit: Page size, capped at Config.ANALYSES_MAX_PAGE_SIZE
+            cursor: next_cursor from the previous page
+            fields: Fields to return (defaults to DEFAULT_ANALYSIS_LIST_FIELDS)
+
+        Returns:
+            tuple: (analyses, next_cursor or None)
+        """
+        fields = fields or DEFAULT_ANALYSIS_LIST_FIELDS
+        limit = max(1, min(limit or Config.ANALYSES_PAGE_SIZE, Config.ANALYSES_MAX_PAGE_SIZE))
+        query = f'SELECT {_analysis_columns(fields)} FROM analyses WHERE competitor_id = ?'
+        params = [competitor_id]
+        if cursor:
+            query += ' AND (timestamp, id) < (?, ?)'
+            params.extend(decode_cursor(cursor))
+        query += ' ORDER BY timestamp DESC, id DESC LIMIT ?'
+        params.append(limit + 1)
+
+        conn = get_db_connection()
+        rows = conn.execute(query, params).fetchall()
+        conn.close()
+
+        analyses = Analysis._unarchive([dict(row) for row in rows[:limit]])
+        next_cursor = None
+        if len(rows) > limit:
+            last = analyses[-1]
+            next_cursor = encode_cursor(last['timestamp'], last['id'])
+        if 'sections' in fields:
+            analyses = Analysis._with_sections(analyses)
+        return analyses, next_cursor
+
+    @staticmethod
+    def get_by_section(section, days=None, limit=100):
+        """
+        Get one section across analyses, e.g. all INVESTMENT ACTIVITY this week.
+
+        Args:
+            section: Section header, case-insensitive (e.g. "investment activity")
+            days: Only include analyses from the last N days
+            limit: Maximum number of rows to return
+        """
+        query = (
+            'SELECT s.analysis_id, s.section, s.body, a.competitor_id, a.timestamp '
+            'FROM analysis_sections s JOIN analyses a ON a.id = s.analysis_id '
+            'WHERE s.section = ?'
+        )
+        params = [section.strip().rstrip(':').strip().upper()]
+        if days is not None:
+            cutoff = datetime.utcnow() - timedelta(days=days)
+            query += ' AND a.timestamp >= ?'
+            params.append(cutoff.strftime('%Y-%m-%d %H:%M:%S'))
+        query += ' ORDER BY a.timestamp DESC LIMIT ?'
+        params.append(limit)
+        conn = get_db_connection()
+        rows = conn.execute(query, params).fetchall()
+        conn.close()
+        return [dict(row) for row in rows]
+
+    @staticmethod
+    def backfill_sections():
+        """
+        Parse sections for analyses stored before the sections table existed.
+
+        Each analysis is parsed once: sections_parsed marks it done even when
+        it has no sections, so later startups don't re-scan it.
+        """
+        conn = get_db_connection()
+        rows = conn.execute(
+            'SELECT id, analysis FROM analyses WHERE sections_parsed = 0'
+        ).fetchall()
+        for row in rows:
+            Analysis._insert_sections(conn, row['id'], row['analysis'])
+            conn.execute('UPDATE analyses SET sections_parsed = 1 WHERE id = ?', (row['id'],))
+        conn.commit()
+        conn.close()
+        return len(rows)
+
+    @staticmethod
+    def search(query, limit=20, offset=0):
+        """Full-text search over analyses, best bm25 match first (companies weighted 2x)."""
+        conn = get_db_connection()
+        rows = conn.execute(
+            "SELECT a.id, a.competitor_id, c.name AS competitor, a.timestamp, "
+            "snippet(analyses_fts, -1, '<mark>', '</mark>', '...', 16) AS snippet, "
+            "bm25(analyses_fts, 1.0, 2.0) AS rank "
+            "FROM analyses_fts "
+            "JOIN analyses a ON a.id = analyses_fts.rowid "
+            "LEFT JOIN competitors c ON c.id = a.competitor_id "
+            "WHERE analyses_fts MATCH ? ORDER BY rank LIMIT ? OFFSET ?",
+            (fts_query(query), limit, offset)
+        ).fetchall()
+        conn.close()
+        return [dict(row) for row in rows]
+
+class Article:
+    """Scraped article model, persisted so past intelligence stays searchable."""
+
+    @staticmethod
+    def record(article, content, summary=None):
+        """
+        Save a scraped article and its AI summary (queued on the write-behind thread).
+
+        Args:
+            article: Article dict from CompetitiveScraper
+            content: The "Title/Content" text the summary was generated from
+            summary: AI summary, if one is available
+        """
+        companies = next(
+            (s['body'] for s in parse_analysis_sections(summary) if s['section'] == 'COMPANIES MENTIONED'),
+            None
+        )
+        row = (
+            get_content_hash(content),
+            article.get('url') or article.get('link', ''),
+            article.get('source', ''),
+            article.get('title', ''),
+            article.get('content', ''),
+            article.get('published', ''),
+            summary,
+            companies
+        )
+        defer_write(lambda conn: Article._upsert(conn, row))
+
+    @staticmethod
+    def _upsert(conn, row):
+        content_hash, source, summary, companies = row[0], row[2], row[6], row[7]
+        inserted = conn.execute(
+            'INSERT INTO articles (content_hash, url, source, title, content, published, summary, companies) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (content_hash) DO NOTHING RETURNING id, scraped_at',
+            row
+        ).fetchone()
+        if inserted:
+            article_id, scraped_at, had_companies = inserted['id'], inserted['scraped_at'], False
+            Stats.record_article(conn, source)
+        else:
+            existing = conn.execute(
+                'SELECT id, scraped_at, companies FROM articles WHERE content_hash = ?', (content_hash,)
+            ).fetchone()
+            article_id, scraped_at, had_companies = existing['id'], existing['scraped_at'], existing['companies'] is not None
+            if summary is not None:
+                conn.execute(
+                    'UPDATE articles SET summary = ?, companies = COALESCE(?, companies) WHERE id = ?',
+                    (summary, companies, article_id)
+                )
+        if companies and not had_companies:
+            Entity.record_mentions(conn, companies, article_id=article_id, mentioned_at=scraped_at)
+
+    @staticmethod
+    def list_feed(limit=None, cursor=None, source=None):
+        """
+        Get one page of stored articles, newest first, for the dashboard feed.
+
+        Keyset pagination on (scraped_at, id) over idx_articles_scraped_at, so
+        deep pages cost the same as the first. Each article carries its summary
+        pre-parsed into sections; the full content is left out.
+
+        Returns:
+            tuple: (articles, next_cursor or None)
+        """
+        limit = max(1, min(limit or Config.FEED_PAGE_SIZE, Config.FEED_MAX_PAGE_SIZE))
+        query = 'SELECT id, title, url, source, published, scraped_at, summary FROM articles WHERE 1 = 1'
+        params = []
+        if source:
+            query += ' AND source = ?'
+            params.append(source)
+        if cursor:
+            query += ' AND (scraped_at, id) < (?, ?)'
+            params.extend(decode_cursor(cursor))
+        query += ' ORDER BY scraped_at DESC, id DESC LIMIT ?'
+        params.append(limit + 1)
+
+        conn = get_db_connection()
+        rows = conn.execute(query, params).fetchall()
+        conn.close()
+
+        articles = [dict(row) for row in rows[:limit]]
+        for article in articles:
+            article['sections'] = parse_analysis_sections(article['summary'])
+        next_cursor = None
+        if len(rows) > limit:
+            last = articles[-1]
+            next_cursor = encode_cursor(last['scraped_at'], last['id'])
+        return articles, next_cursor
+
+    @staticmethod
+    def search(query, limit=20, offset=0):
+        """Full-text search over article titles, content and mentioned companies."""
+        conn = get_db_connection()
+        rows = conn.execute(
+            "SELECT a.id, a.title, a.source, a.url, a.published, a.scraped_at, "
+            "snippet(articles_fts, -1, '<mark>', '</mark>', '...', 16) AS snippet, "
+            "bm25(articles_fts, 3.0, 1.0, 2.0) AS rank "
+            "FROM articles_fts "
+            "JOIN articles a ON a.id = articles_fts.rowid "
+            "WHERE articles_fts MATCH ? ORDER BY rank LIMIT ? OFFSET ?",
+            (fts_query(query), limit, offset)
+        ).fetchall()
+        conn.close()
+        return [dict(row) for row in rows]
+
+class Stats:
+    """
+    Rollups kept current in the write path, so reading them never scans history.
+
+    Totals live in competitor_stats/source_stats and per-day counts in the
+    *_daily_stats tables; each insert bumps both in the same transaction.
+    """
+
+    @staticmethod
+    def _now():
+        return datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+
+    @staticmethod
+    def record_analysis(conn, competitor_id):
+        """Count a new analysis for its competitor (call inside the insert's transaction)."""
+        now = Stats._now()
+        conn.execute(
+            'INSERT INTO competitor_stats (competitor_id, analyses_count, last_analysis_at) VALUES (?, 1, ?) '
+            'ON CONFLICT (competitor_id) DO UPDATE SET '
+            'analyses_count = competitor_stats.analyses_count + 1, last_analysis_at = excluded.last_analysis_at',
+            (competitor_id, now)
+        )
+        conn.execute(
+            'INSERT INTO competitor_daily_stats (competitor_id, day, analyses_count, last_analysis_at) VALUES (?, ?, 1, ?) '
+            'ON CONFLICT (competitor_id, day) DO UPDATE SET '
+            'analyses_count = competitor_daily_stats.analyses_count + 1, last_analysis_at = excluded.last_analysis_at',
+            (competitor_id, now[:10], now)
+        )
+
+    @staticmethod
+    def record_article(conn, source):
+        """Count a newly scraped article for its source (call inside the insert's transaction)."""
+        now = Stats._now()
+        conn.execute(
+            'INSERT INTO source_stats (source, articles_count, last_seen_at) VALUES (?, 1, ?) '
+            'ON CONFLICT (source) DO UPDATE SET '
+            'articles_count = source_stats.articles_count + 1, last_seen_at = excluded.last_seen_at',
+            (source or '', now)
+        )
+        conn.execute(
+            'INSERT INTO source_daily_stats (source, day, articles_count, last_seen_at) VALUES (?, ?, 1, ?) '
+            'ON CONFLICT (source, day) DO UPDATE SET '
+            'articles_count = source_daily_stats.articles_count + 1, last_seen_at = excluded.last_seen_at',
+            (source or '', now[:10], now)
+        )
+
+    @staticmethod
+    def summary(days=14):
+        """
+        Read the rollups: totals per competitor and source plus daily counts for the last N days.
+        """
+        since = (datetime.utcnow() - timedelta(days=days - 1)).strftime('%Y-%m-%d')
+        conn = get_db_connection()
+        competitors = conn.execute(
+            'SELECT s.competitor_id, c.name, s.analyses_count, s.last_analysis_at '
+            'FROM competitor_stats s LEFT JOIN competitors c ON c.id = s.competitor_id '
+            'ORDER BY s.analyses_count DESC'
+        ).fetchall()
+        sources = conn.execute(
+            'SELECT source, articles_count, last_seen_at FROM source_stats ORDER BY articles_count DESC'
+        ).fetchall()
+        competitor_daily = conn.execute(
+            'SELECT competitor_id, day, analyses_count FROM competitor_daily_stats '
+            'WHERE day >= ? ORDER BY day, competitor_id',
+            (since,)
+        ).fetchall()
+        source_daily = conn.execute(
+            'SELECT source, day, articles_count FROM source_daily_stats '
+            'WHERE day >= ? ORDER BY day, source',
+            (since,)
+        ).fetchall()
+        conn.close()
+        return {
+            "competitors": [dict(row) for row in competitors],
+            "sources": [dict(row) for row in sources],
+            "daily": {
+                "since": since,
+                "analyses_per_competitor": [dict(row) for row in competitor_daily],
+                "articles_per_source": [dict(row) for row in source_daily]
+            }
+        }
+
+class Entity:
+    """Companies parsed from COMPANIES MENTIONED, with alias folding and a mention index."""
+
+    @staticmethod
+    def _resolve(conn, name):
+        """Get (or create) the entity id for a display name, registering it as an alias."""
+        alias = normalize_entity_name(name)
+        row = conn.execute('SELECT entity_id FROM entity_aliases WHERE alias = ?', (alias,)).fetchone()
+        if row:
+            return row['entity_id']
+        conn.execute(
+            'INSERT INTO entities (name, normalized) VALUES (?, ?) ON CONFLICT (normalized) DO NOTHING',
+            (name, alias)
+        )
+        entity_id = conn.execute('SELECT id FROM entities WHERE normalized = ?', (alias,)).fetchone()['id']
+        conn.execute(
+            'INSERT INTO entity_aliases (alias, entity_id) VALUES (?, ?) ON CONFLICT (alias) DO NOTHING',
+            (alias, entity_id)
+        )
+        if Config.ENTITY_AUTO_CREATE_COMPETITORS:
+            created = conn.execute(
+                "INSERT INTO competitors (name, website) VALUES (?, 'entity-mention') ON CONFLICT (name) DO NOTHING",
+                (name,)
+            )
+            if created.rowcount > 0:
+                Competitor.invalidate_cache()
+        return entity_id
+
+    @staticmethod
+    def record_mentions(conn, companies_text, analysis_id=None, article_id=None, mentioned_at=None):
+        """
+        Index every company in a COMPANIES MENTIONED body (call inside the insert's transaction).
+
+        mentioned_at should be the source row's time (analysis timestamp or
+        article scraped_at) so backfilled history lands in the right week.
+        """
+        mentioned_at = mentioned_at or datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+        entity_ids = []
+        for name in split_entity_list(companies_text):
+            entity_id = Entity._resolve(conn, name)
+            if entity_id not in entity_ids:
+                entity_ids.append(entity_id)
+        conn.executemany(
+            'INSERT INTO entity_mentions (entity_id, analysis_id, article_id, mentioned_at) VALUES (?, ?, ?, ?)',
+            [(entity_id, analysis_id, article_id, mentioned_at) for entity_id in entity_ids]
+        )
+        return entity_ids
+
+    @staticmethod
+    def add_alias(alias, entity_name):
+        """Fold another spelling (e.g. "ZG") into an existing entity."""
+        conn = get_db_connection()
+        entity_id = Entity._resolve(conn, entity_name)
+        conn.execute(
+            'INSERT INTO entity_aliases (alias, entity_id) VALUES (?, ?) '
+            'ON CONFLICT (alias) DO UPDATE SET entity_id = excluded.entity_id',
+            (normalize_entity_name(alias), entity_id)
+        )
+        conn.commit()
+        conn.close()
+        return entity_id
+
+    @staticmethod
+    def get_by_name(name):
+        """Look up an entity by any of its aliases."""
+        conn = get_db_connection()
+        row = conn.execute(
+            'SELECT e.id, e.name, e.normalized, e.first_seen_at FROM entity_aliases a '
+            'JOIN entities e ON e.id = a.entity_id WHERE a.alias = ?',
+            (normalize_entity_name(name),)
+        ).fetchone()
+        conn.close()
+        return dict(row) if row else None
+
+    @staticmethod
+    def get_mentions(entity_id, limit=None, cursor=None):
+        """
+        Page through where an entity was mentioned, newest first.
+
+        Returns:
+            tuple: (mentions, next_cursor or None)
+        """
+        limit = max(1, min(limit or Config.ANALYSES_PAGE_SIZE, Config.ANALYSES_MAX_PAGE_SIZE))
+        query = (
+            'SELECT m.id, m.mentioned_at, m.analysis_id, a.competitor_id, c.name AS competitor, '
+            'm.article_id, ar.title AS article_title, ar.url AS article_url, ar.source AS article_source '
+            'FROM entity_mentions m '
+            'LEFT JOIN analyses a ON a.id = m.analysis_id '
+            'LEFT JOIN competitors c ON c.id = a.competitor_id '
+            'LEFT JOIN articles ar ON ar.id = m.article_id '
+            'WHERE m.entity_id = ?'
+        )
+        params = [entity_id]
+        if cursor:
+            query += ' AND (m.mentioned_at, m.id) < (?, ?)'
+            params.extend(decode_cursor(cursor))
+        query += ' ORDER BY m.mentioned_at DESC, m.id DESC LIMIT ?'
+        params.append(limit + 1)
+        conn = get_db_connection()
+        rows = conn.execute(query, params).fetchall()
+        conn.close()
+        mentions = [dict(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = encode_cursor(mentions[-1]['mentioned_at'], mentions[-1]['id'])
+        return mentions, next_cursor
+
+    @staticmethod
+    def top(days=7, limit=20):
+        """Most-mentioned entities over the last N days."""
+        since = (datetime.utcnow() - timedelta(days=days)).strftime('%Y-%m-%d %H:%M:%S')
+        conn = get_db_connection()
+        rows = conn.execute(
+            'SELECT e.id, e.name, COUNT(*) AS mentions, MAX(m.mentioned_at) AS last_mentioned_at '
+            'FROM entity_mentions m JOIN entities e ON e.id = m.entity_id '
+            'WHERE m.mentioned_at >= ? '
+            'GROUP BY e.id, e.name ORDER BY mentions DESC, last_mentioned_at DESC LIMIT ?',
+            (since, limit)
+        ).fetchall()
+        conn.close()
+        return [dict(row) for row in rows]
+
+    @staticmethod
+    def backfill():
+        """Index COMPANIES MENTIONED for analyses and articles stored before the entity index."""
+        conn = get_db_connection()
+        analyses = conn.execute(
+            "SELECT s.analysis_id, s.body, a.timestamp FROM analysis_sections s "
+            "JOIN analyses a ON a.id = s.analysis_id "
+            "WHERE s.section = 'COMPANIES MENTIONED' "
+            "AND NOT EXISTS (SELECT 1 FROM entity_mentions m WHERE m.analysis_id = s.analysis_id)"
+        ).fetchall()
+        articles = conn.execute(
+            "SELECT id, companies, scraped_at FROM articles WHERE companies IS NOT NULL "
+            "AND NOT EXISTS (SELECT 1 FROM entity_mentions m WHERE m.article_id = articles.id)"
+        ).fetchall()
+        for row in analyses:
+            Entity.record_mentions(conn, row['body'], analysis_id=row['analysis_id'], mentioned_at=row['timestamp'])
+        for row in articles:
+            Entity.record_mentions(conn, row['companies'], article_id=row['id'], mentioned_at=row['scraped_at'])
+        conn.commit()
+        conn.close()
+        return len(analyses) + len(articles)
@@ -9,9 +9,9 @@ import html
 import time
 import re
 import asyncio
+import threading
 from datetime import datetime, timedelta
 import xml.etree.ElementTree as ET
-from functools import lru_cache
 from typing import List, Dict, Any
 import requests
 from bs4 import BeautifulSoup
@@ -22,60 +22,78 @@ logger = logging.getLogger(__name__)
 class CompetitiveScraper:
     """Scraper for competitive analysis."""
     
-    # PropTech keywords for content filtering
-    PROPTECH_KEYWORDS = [
+    # PropTech keywords for content filtering, grouped by category (trends.py
+    # reports on the categories)
+    PROPTECH_KEYWORD_CATEGORIES = {
         # === PEOPLE & ROLES ===
-        'renters', 'tenants', 'landlords', 'property managers', 'property management',
-        'real estate agents', 'real estate brokers', 'realtors', 'leasing agents',
-        'property owners', 'homeowners', 'buyers', 'sellers', 'investors',
-        'developers', 'contractors', 'architects', 'property inspectors',
-        'agent', 'agents', 'broker', 'brokers', 'brokerage', 'brokerages',
+        'people_roles': [
+            'renters', 'tenants', 'landlords', 'property managers', 'property management',
+            'real estate agents', 'real estate brokers', 'realtors', 'leasing agents',
+            'property owners', 'homeowners', 'buyers', 'sellers', 'investors',
+            'developers', 'contractors', 'architects', 'property inspectors',
+            'agent', 'agents', 'broker', 'brokers', 'brokerage', 'brokerages'
+        ],
         # === JARGON & INDUSTRY TERMS ===
-        'MLS', 'escrow', 'title insurance', 'closing costs', 'listing agent', 'buyer agent',
-        'dual agency', 'commission', 'open house', 'walkthrough', 'staging', 'zoning', 'permit',
-        'deed', 'foreclosure', 'short sale', 'flip', 'fixer-upper', 'turnkey', 'cap rate', 'NOI',
-        'cash flow', '1031 exchange', 'syndication', 'crowdfunding', 'fractional ownership',
-        'blockchain real estate', 'tokenization', 'smart contract',
+        'industry_terms': [
+            'MLS', 'escrow', 'title insurance', 'closing costs', 'listing agent', 'buyer agent',
+            'dual agency', 'commission', 'open house', 'walkthrough', 'staging', 'zoning', 'permit',
+            'deed', 'foreclosure', 'short sale', 'flip', 'fixer-upper', 'turnkey', 'cap rate', 'NOI',
+            'cash flow', '1031 exchange', 'syndication', 'crowdfunding', 'fractional ownership',
+            'blockchain real estate', 'tokenization', 'smart contract'
+        ],
         # === PROPERTY TYPES ===
-        'real estate', 'property', 'properties', 'housing', 'homes', 'houses',
-        'apartments', 'condos', 'condominiums', 'townhomes', 'single family',
-        'multi family', 'commercial property', 'commercial real estate',
-        'office buildings', 'office space', 'retail space', 'warehouses',
-        'industrial property', 'land', 'lots', 'vacant land',
+        'property_types': [
+            'real estate', 'property', 'properties', 'housing', 'homes', 'houses',
+            'apartments', 'condos', 'condominiums', 'townhomes', 'single family',
+            'multi family', 'commercial property', 'commercial real estate',
+            'office buildings', 'office space', 'retail space', 'warehouses',
+            'industrial property', 'land', 'lots', 'vacant land'
+        ],
         # === FINANCIAL & TRANSACTIONS ===
-        'property values', 'home values', 'property valuation', 'appraisal',
-        'mortgage', 'mortgages', 'lending', 'loan', 'refinancing',
-        'down payment', 'escrow', 'title',
-        'rent', 'rental', 'lease', 'leasing', 'rent control',
-        'property taxes', 'hoa fees', 'maintenance costs',
-        'investment property', 'property investment', 'real estate investment',
-        'reit', 'real estate funds', 'crowdfunding real estate',
+        'financial': [
+            'property values', 'home values', 'property valuation', 'appraisal',
+            'mortgage', 'mortgages', 'lending', 'loan', 'refinancing',
+            'down payment', 'escrow', 'title',
+            'rent', 'rental', 'lease', 'leasing', 'rent control',
+            'property taxes', 'hoa fees', 'maintenance costs',
+            'investment property', 'property investment', 'real estate investment',
+            'reit', 'real estate funds', 'crowdfunding real estate'
+        ],
         # === TECHNOLOGY & PLATFORMS ===
-        'proptech', 'property technology', 'real estate tech', 'real estate technology',
-        'real estate platform', 'rental platform', 'property platform',
-        'real estate app', 'property app', 'rental app',
-        'property management software', 'real estate software',
-        'smart building', 'smart home', 'iot building', 'building automation',
-        'property analytics', 'real estate data', 'property data',
-        'virtual tours', 'digital property', 'online real estate',
+        'technology_platforms': [
+            'proptech', 'property technology', 'real estate tech', 'real estate technology',
+            'real estate platform', 'rental platform', 'property platform',
+            'real estate app', 'property app', 'rental app',
+            'property management software', 'real estate software',
+            'smart building', 'smart home', 'iot building', 'building automation',
+            'property analytics', 'real estate data', 'property data',
+            'virtual tours', 'digital property', 'online real estate'
+        ],
         # === BUSINESS MODELS & SERVICES ===
-        'facility management', 'building management',
-        'real estate services', 'property services', 'leasing services',
-        'co-living', 'co-working', 'flexible space', 'shared space',
-        'short term rental', 'vacation rental', 'corporate housing',
-        'build to rent', 'rent to own', 'lease to own',
-        'property marketplace', 'real estate marketplace',
+        'business_models': [
+            'facility management', 'building management',
+            'real estate services', 'property services', 'leasing services',
+            'co-living', 'co-working', 'flexible space', 'shared space',
+            'short term rental', 'vacation rental', 'corporate housing',
+            'build to rent', 'rent to own', 'lease to own',
+            'property marketplace', 'real estate marketplace'
+        ],
         # === CONSTRUCTION & DEVELOPMENT ===
-        'construction', 'construction tech', 'building', 'development',
-        'new construction', 'renovation', 'remodeling', 'home improvement',
-        'general contractor', 'subcontractor', 'construction management',
-        'building materials', 'construction software', 'project management',
+        'construction': [
+            'construction', 'construction tech', 'building', 'development',
+            'new construction', 'renovation', 'remodeling', 'home improvement',
+            'general contractor', 'subcontractor', 'construction management',
+            'building materials', 'construction software', 'project management'
+        ],
         # === MARKET SEGMENTS ===
-        'residential real estate', 'commercial real estate', 'industrial real estate',
-        'luxury real estate', 'affordable housing', 'student housing',
-        'senior housing', 'hospitality real estate', 'retail real estate',
-        'mixed use', 'urban development', 'suburban development'
-    ]
+        'market_segments': [
+            'residential real estate', 'commercial real estate', 'industrial real estate',
+            'luxury real estate', 'affordable housing', 'student housing',
+            'senior housing', 'hospitality real estate', 'retail real estate',
+            'mixed use', 'urban development', 'suburban development'
+        ],
+    }
+    PROPTECH_KEYWORDS = [keyword for keywords in PROPTECH_KEYWORD_CATEGORIES.values() for keyword in keywords]
 
     # Cache duration in seconds
     CACHE_DURATION = 300  # 5 minutes
@@ -105,20 +123,29 @@ class CompetitiveScraper:
         }
         self._cache = {}
         self._cache_timestamps = {}
+        # Instances are shared across threads (see services.py)
+        self._cache_lock = threading.Lock()
+        # Keep-alive connection pool for synchronous article fetches
+        self._http = requests.Session()
 
-    @lru_cache(maxsize=32)
     def _get_cached_content(self, url):
         """Get cached content if available and not expired."""
-        if url in self._cache:
-            timestamp = self._cache_timestamps.get(url, 0)
-            if time.time() - timestamp < self.CACHE_DURATION:
-                return self._cache[url]
+        with self._cache_lock:
+            if url in self._cache:
+                timestamp = self._cache_timestamps.get(url, 0)
+                if time.time() - timestamp < self.CACHE_DURATION:
+                    return self._cache[url]
         return None
 
     def _cache_content(self, url, content):
         """Cache content with timestamp."""
-        self._cache[url] = content
-        self._cache_timestamps[url] = time.time()
+        with self._cache_lock:
+            self._cache[url] = content
+            self._cache_timestamps[url] = time.time()
+
+    def close(self):
+        """Close the HTTP connection pool."""
+        self._http.close()
 
     async def _fetch_url(self, session, url, headers):
         """Fetch URL content asynchronously."""
@@ -126,6 +153,9 @@ class CompetitiveScraper:
             cached_content = self._get_cached_content(url)
             if cached_content:
                 return cached_content
+            if session is None:
+                async with aiohttp.ClientSession() as own_session:
+                    return await self._fetch_url(own_session, url, headers)
             async with session.get(url, headers=headers, timeout=10) as response:
                 response.raise_for_status()
                 content = await response.text()
@@ -135,8 +165,11 @@ class CompetitiveScraper:
             logger.error(f"Failed to fetch {url}: {str(e)}")
             return ''
 
-    async def _scrape_rss_feed_async(self, feed_url: str, source_name: str, max_articles: int = 5) -> List[Dict[str, Any]]:
+    async def _scrape_rss_feed_async(self, feed_url: str, source_name: str, max_articles: int = 5, session=None) -> List[Dict[str, Any]]:
         """Scrape articles from an RSS feed with a limit using BeautifulSoup only."""
+        if session is None:
+            async with aiohttp.ClientSession() as own_session:
+                return await self._scrape_rss_feed_async(feed_url, source_name, max_articles, own_session)
         try:
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
@@ -145,33 +178,32 @@ class CompetitiveScraper:
                 'Cache-Control': 'no-cache',
                 'Pragma': 'no-cache'
             }
-            async with aiohttp.ClientSession() as session:
-                async with session.get(feed_url, headers=headers, timeout=10) as response:
-                    if response.status != 200:
-                        logger.error(f"Failed to fetch RSS feed {feed_url} for {source_name}: {response.status}")
-                        return []
-                    content = await response.text()
-                    soup = BeautifulSoup(content, 'xml')
-                    items = soup.find_all('item')
-                    logger.info(f"[DEBUG] {source_name}: Found {len(items)} <item> elements in RSS feed.")
-                    items = items[:max_articles]
-                    articles = []
-                    for item in items:
-                        title = item.find('title')
-                        link = item.find('link')
-                        description = item.find('description')
-                        pub_date = item.find('pubDate')
-                        article = {
-                            'title': title.get_text() if title else '',
-                            'url': link.get_text().strip() if link else '',
-                            'link': link.get_text().strip() if link else '',
-                            'published': pub_date.get_text() if pub_date else '',
-                            'source': source_name,
-                            'content': description.get_text() if description else ''
-                        }
-                        articles.append(article)
-                    logger.info(f"[DEBUG] {source_name}: Extracted {len(articles)} articles from RSS feed.")
-                    return articles
+            async with session.get(feed_url, headers=headers, timeout=10) as response:
+                if response.status != 200:
+                    logger.error("Failed to fetch RSS feed %s for %s: %s", feed_url, source_name, response.status)
+                    return []
+                content = await response.text()
+                soup = BeautifulSoup(content, 'xml')
+                items = soup.find_all('item')
+                logger.debug("%s: Found %d <item> elements in RSS feed.", source_name, len(items))
+                items = items[:max_articles]
+                articles = []
+                for item in items:
+                    title = item.find('title')
+                    link = item.find('link')
+                    description = item.find('description')
+                    pub_date = item.find('pubDate')
+                    article = {
+                        'title': title.get_text() if title else '',
+                        'url': link.get_text().strip() if link else '',
+                        'link': link.get_text().strip() if link else '',
+                        'published': pub_date.get_text() if pub_date else '',
+                        'source': source_name,
+                        'content': description.get_text() if description else ''
+                    }
+                    articles.append(article)
+                logger.debug("%s: Extracted %d articles from RSS feed.", source_name, len(articles))
+                return articles
         except Exception as e:
             logger.error(f"Error scraping RSS feed {feed_url} for {source_name}: {str(e)}")
             return []
@@ -267,15 +299,17 @@ class CompetitiveScraper:
 
     async def _scrape_all_sources_async(self, max_articles_per_source: int = 5) -> List[Dict[str, Any]]:
         """Scrape all sources with limits, using custom scrapers for HTML sources."""
-        tasks = []
-        for source_name, source_info in self.sources.items():
-            if source_name == 'propmodo':
-                tasks.append(self._scrape_propmodo_async(None, max_articles_per_source))
-            elif source_name == 'proptechzone':
-                tasks.append(self._scrape_proptechzone_async(None, max_articles_per_source))
-            else:
-                tasks.append(self._scrape_rss_feed_async(source_info, source_name, max_articles_per_source))
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        # One session (connection pool) shared by every source in this scrape
+        async with aiohttp.ClientSession() as session:
+            tasks = []
+            for source_name, source_info in self.sources.items():
+                if source_name == 'propmodo':
+                    tasks.append(self._scrape_propmodo_async(session, max_articles_per_source))
+                elif source_name == 'proptechzone':
+                    tasks.append(self._scrape_proptechzone_async(session, max_articles_per_source))
+                else:
+                    tasks.append(self._scrape_rss_feed_async(source_info, source_name, max_articles_per_source, session))
+            results = await asyncio.gather(*tasks, return_exceptions=True)
         all_articles = []
         for result in results:
             if isinstance(result, list):
@@ -284,30 +318,38 @@ class CompetitiveScraper:
                 logger.error(f"Error in scraping task: {str(result)}")
         return all_articles
 
-    def scrape_proptech_articles(self, max_articles: int = 5) -> List[Dict[str, Any]]:
-        """Scrape PropTech articles with a limit, always returning at least 3 articles from any source if not enough match the filter."""
+    async def scrape_proptech_articles_async(self, max_articles: int = 5) -> List[Dict[str, Any]]:
+        """Async scrape_proptech_articles() for callers already running an event loop."""
         try:
-            articles = asyncio.run(self._scrape_all_sources_async(max_articles_per_source=3))
-            filtered_articles = []
-            non_matching_articles = []
-            
-            for article in articles:
-                if self.is_proptech_relevant(article['title'] + ' ' + article['content']):
-                    filtered_articles.append(article)
-                else:
-                    non_matching_articles.append(article)
-                if len(filtered_articles) >= max_articles:
-                    break
-            # If not enough filtered, fill with non-matching articles
-            if len(filtered_articles) < 3:
-                needed = 3 - len(filtered_articles)
-                filtered_articles.extend(non_matching_articles[:needed])
-            # Always return at least 3, up to max_articles
-            return filtered_articles[:max(max_articles, 3)]
+            articles = await self._scrape_all_sources_async(max_articles_per_source=3)
+            return self._select_proptech_articles(articles, max_articles)
         except Exception as e:
             logger.error(f"Error in scrape_proptech_articles: {str(e)}")
             return []
 
+    def scrape_proptech_articles(self, max_articles: int = 5) -> List[Dict[str, Any]]:
+        """Scrape PropTech articles with a limit, always returning at least 3 articles from any source if not enough match the filter."""
+        return asyncio.run(self.scrape_proptech_articles_async(max_articles))
+
+    def _select_proptech_articles(self, articles, max_articles):
+        """Keep relevant articles, topping up with others so at least 3 are returned."""
+        filtered_articles = []
+        non_matching_articles = []
+        
+        for article in articles:
+            if self.is_proptech_relevant(article['title'] + ' ' + article['content']):
+                filtered_articles.append(article)
+            else:
+                non_matching_articles.append(article)
+            if len(filtered_articles) >= max_articles:
+                break
+        # If not enough filtered, fill with non-matching articles
+        if len(filtered_articles) < 3:
+            needed = 3 - len(filtered_articles)
+            filtered_articles.extend(non_matching_articles[:needed])
+        # Always return at least 3, up to max_articles
+        return filtered_articles[:max(max_articles, 3)]
+
     def _clean_html_entities(self, text):
         """Clean HTML entities from text."""
         return html.unescape(text) if text else ''
@@ -353,7 +395,7 @@ class CompetitiveScraper:
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
             }
-            response = requests.get(url, headers=headers, timeout=10)
+            response = self._http.get(url, headers=headers, timeout=10)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.text, 'html.parser')
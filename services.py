@@ -0,0 +1,93 @@
+"""
+Long-lived analyzer and scraper instances shared by every request.
+
+Building a CompetitiveAnalyzer creates a new OpenAI HTTP client (and so new
+TLS connections), and a fresh CompetitiveScraper starts with an empty page
+cache. The container creates each service once per process on first use,
+hands the same thread-safe instance to every caller, and closes them at
+shutdown.
+"""
+
+import os
+import atexit
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+class Services:
+    """Per-process container for the analyzer/scraper services."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._analyzer = None
+        self._async_analyzer = None
+        self._scraper = None
+
+    def _reset_after_fork(self):
+        # HTTP clients and their sockets must not be shared with the parent
+        if self._pid != os.getpid():
+            self._analyzer = self._async_analyzer = self._scraper = None
+            self._pid = os.getpid()
+
+    def _get(self, attr, factory):
+        instance = getattr(self, attr)
+        if instance is not None and self._pid == os.getpid():
+            return instance
+        with self._lock:
+            self._reset_after_fork()
+            if getattr(self, attr) is None:
+                setattr(self, attr, factory())
+            return getattr(self, attr)
+
+    def analyzer(self):
+        """Shared CompetitiveAnalyzer (raises ValueError without an API key)."""
+        def build():
+            from analyzer import CompetitiveAnalyzer  # Heavy (openai); imported on first use
+            return CompetitiveAnalyzer()
+        return self._get('_analyzer', build)
+
+    def async_analyzer(self):
+        """Shared AsyncCompetitiveAnalyzer for the ASGI event loop."""
+        def build():
+            from analyzer import AsyncCompetitiveAnalyzer
+            return AsyncCompetitiveAnalyzer()
+        return self._get('_async_analyzer', build)
+
+    def scraper(self):
+        """Shared CompetitiveScraper."""
+        def build():
+            from scraper import CompetitiveScraper  # Heavy (bs4/aiohttp/requests); imported on first use
+            return CompetitiveScraper()
+        return self._get('_scraper', build)
+
+    def shutdown(self):
+        """Close the sync services' connection pools."""
+        with self._lock:
+            if self._pid != os.getpid():
+                return
+            for instance in (self._analyzer, self._scraper):
+                if instance is not None:
+                    try:
+                        instance.close()
+                    except Exception as e:
+                        logger.error("Error closing %s: %s", type(instance).__name__, e)
+            self._analyzer = self._scraper = None
+
+    async def ashutdown(self):
+        """Close the async analyzer (on its own event loop), then the sync services."""
+        if self._async_analyzer is not None and self._pid == os.getpid():
+            try:
+                await self._async_analyzer.aclose()
+            except Exception as e:
+                logger.error("Error closing AsyncCompetitiveAnalyzer: %s", e)
+            self._async_analyzer = None
+        self.shutdown()
+
+services = Services()
+atexit.register(services.shutdown)
+
+def init_services(app):
+    """Expose the container as app.extensions['services']."""
+    app.extensions['services'] = services
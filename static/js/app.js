@@ -1,101 +1,63 @@
-document.addEventListener('DOMContentLoaded', function() {
-    const loadBtn = document.getElementById('load-articles');
-    const articlesDiv = document.getElementById('articles');
+// [label, text] pairs for an article's summary, parsed once and shared by both layouts
+function summarySections(article) {
+    const analysisText = article.summary || article.proptech_analysis;
+    if (!analysisText) return null;
+    // Sections are parsed server-side when the analysis is written
+    if (article.sections && article.sections.length > 0) {
+        return article.sections.map(s => [s.section, s.body]);
+    }
+    // Fallback for old format
+    return analysisText.split(/\n?\s*\d+\.\s+/).filter(Boolean).map((point, idx) => {
+        const colonIdx = point.indexOf(':');
+        if (colonIdx > 0) {
+            return [point.slice(0, colonIdx).trim(), point.slice(colonIdx + 1).trim()];
+        }
+        return [`Point ${idx + 1}`, point];
+    });
+}
 
-    loadBtn.addEventListener('click', async function() {
-        articlesDiv.innerHTML = '<p>Loading articles...</p>';
-        try {
-            const res = await fetch('/api/proptech-intelligence');
-            const data = await res.json();
-<<<<<<< HEAD
-            if (data.intelligence && data.intelligence.length > 0) {
-                articlesDiv.innerHTML = data.intelligence.map(article => {
-                    const articleUrl = article.url || article.link || '';
-                    // Parse AI summary into table with bold headers
-                    let summaryRows = '';
-                    let summaryBlocks = '';
-                    if (article.summary || article.proptech_analysis) {
-                        const analysisText = article.summary || article.proptech_analysis;
-                        const sections = analysisText.split('**');
-=======
-            if (data.analyses && data.analyses.length > 0) {
-                articlesDiv.innerHTML = data.analyses.map(article => {
-                    const articleUrl = article.link || '';
-                    // Parse AI summary into table with bold headers
-                    let summaryRows = '';
-                    let summaryBlocks = '';
-                    if (article.proptech_analysis) {
-                        const sections = article.proptech_analysis.split('**');
->>>>>>> 80b4af1a639f50148534b7d9d0c486a88f307bdb
-                        if (sections.length > 1) {
-                            // Table rows for desktop
-                            summaryRows = sections.slice(1).reduce((acc, val, idx, arr) => {
-                                if (idx % 2 === 0 && arr[idx + 1]) {
-                                    const label = arr[idx].replace(':', '').trim();
-                                    const content = arr[idx + 1].trim();
-                                    if (content && !content.startsWith('[')) {
-                                        acc += `<tr><td class='font-semibold text-gray-700 bg-gray-100 px-3 py-2 w-1/3'>${label}</td><td class='text-gray-800 px-3 py-2'>${content}</td></tr>`;
-                                    }
-                                }
-                                return acc;
-                            }, '');
-                            // Blocks for mobile
-                            summaryBlocks = sections.slice(1).reduce((acc, val, idx, arr) => {
-                                if (idx % 2 === 0 && arr[idx + 1]) {
-                                    const label = arr[idx].replace(':', '').trim();
-                                    const content = arr[idx + 1].trim();
-                                    if (content && !content.startsWith('[')) {
-                                        acc += `<div class='mb-2'><span class='font-semibold text-gray-700'>${label}:</span> <span class='text-gray-800'>${content}</span></div>`;
-                                    }
-                                }
-                                return acc;
-                            }, '');
-                        } else {
-                            // Fallback for old format
-<<<<<<< HEAD
-                            const points = analysisText.split(/\n?\s*\d+\.\s+/).filter(Boolean);
-=======
-                            const points = article.proptech_analysis.split(/\n?\s*\d+\.\s+/).filter(Boolean);
->>>>>>> 80b4af1a639f50148534b7d9d0c486a88f307bdb
-                            summaryRows = points.map((point, idx) => {
-                                const colonIdx = point.indexOf(':');
-                                let label = `Point ${idx + 1}`;
-                                let content = point;
-                                if (colonIdx > 0) {
-                                    label = point.slice(0, colonIdx).trim();
-                                    content = point.slice(colonIdx + 1).trim();
-                                }
-                                return `<tr><td class='font-semibold text-gray-700 bg-gray-100 px-3 py-2 w-1/3'>${label}</td><td class='text-gray-800 px-3 py-2'>${content}</td></tr>`;
-                            }).join('');
-                            summaryBlocks = points.map((point, idx) => {
-                                const colonIdx = point.indexOf(':');
-                                let label = `Point ${idx + 1}`;
-                                let content = point;
-                                if (colonIdx > 0) {
-                                    label = point.slice(0, colonIdx).trim();
-                                    content = point.slice(colonIdx + 1).trim();
-                                }
-                                return `<div class='mb-2'><span class='font-semibold text-gray-700'>${label}:</span> <span class='text-gray-800'>${content}</span></div>`;
-                            }).join('');
-                        }
-                    } else {
-                        summaryRows = '';
-                        summaryBlocks = '<div class="text-gray-500 italic">No summary available.</div>';
-                    }
-                    return `
-  <div class="bg-white rounded-xl shadow p-6 flex flex-col gap-4">
+// Article fields are scraped text and LLM output, so everything interpolated
+// into the card markup is escaped
+const escapeHtml = (text) => String(text == null ? '' : text)
+    .replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;')
+    .replace(/"/g, '&quot;').replace(/'/g, '&#39;');
+
+// Only http(s) links are rendered, so a stored "javascript:" URL can't run
+function safeUrl(url) {
+    try {
+        const parsed = new URL(url);
+        return parsed.protocol === 'http:' || parsed.protocol === 'https:' ? parsed.href : '';
+    } catch (err) {
+        return '';
+    }
+}
+
+function renderArticle(article) {
+    const articleUrl = safeUrl(article.url || article.link || '');
+    // Parse AI summary into table with bold headers
+    let summaryRows = '';
+    let summaryBlocks = '<div class="text-gray-500 italic">No summary available.</div>';
+    const sections = summarySections(article);
+    if (sections) {
+        // Table rows for desktop
+        summaryRows = sections.map(([label, body]) => `<tr><td class='font-semibold text-gray-700 bg-gray-100 px-3 py-2 w-1/3'>${escapeHtml(label)}</td><td class='text-gray-800 px-3 py-2'>${escapeHtml(body)}</td></tr>`).join('');
+        // Blocks for mobile
+        summaryBlocks = sections.map(([label, body]) => `<div class='mb-2'><span class='font-semibold text-gray-700'>${escapeHtml(label)}:</span> <span class='text-gray-800'>${escapeHtml(body)}</span></div>`).join('');
+    }
+    return `
+  <div class="article-card bg-white rounded-xl shadow p-6 flex flex-col gap-4">
     <div class="flex flex-row items-start justify-between gap-4 mb-2">
-      <h2 class="text-lg font-bold text-gray-900 break-words flex-1 pr-2">${article.title}</h2>
-      ${articleUrl ? `<a href="${articleUrl}" target="_blank" rel="noopener noreferrer">
+      <h2 class="text-lg font-bold text-gray-900 break-words flex-1 pr-2">${escapeHtml(article.title)}</h2>
+      ${articleUrl ? `<a href="${escapeHtml(articleUrl)}" target="_blank" rel="noopener noreferrer">
         <button class="bg-[oklch(69.6%_0.17_162.48)] text-white font-semibold py-2 px-4 rounded-lg transition text-base whitespace-nowrap" style="--tw-bg-opacity:1;" onmouseover="this.style.background='oklch(39.3% 0.095 152.535)'" onmouseout="this.style.background='oklch(69.6% 0.17 162.48)'">
           Read More
         </button>
       </a>` : ''}
     </div>
     <div class="flex flex-col sm:flex-row sm:items-center text-sm text-gray-500 gap-1">
-      <span>Source: ${article.source || ''}</span>
-      ${article.published ? `<span class="hidden sm:inline mx-2">|</span><span>Date: ${article.published}</span>` : ''}
-      ${article.author ? `<span class="hidden sm:inline mx-2">|</span><span>Author: ${article.author}</span>` : ''}
+      <span>Source: ${escapeHtml(article.source)}</span>
+      ${article.published ? `<span class="hidden sm:inline mx-2">|</span><span>Date: ${escapeHtml(article.published)}</span>` : ''}
+      ${article.author ? `<span class="hidden sm:inline mx-2">|</span><span>Author: ${escapeHtml(article.author)}</span>` : ''}
     </div>
     <div>
       <div class="font-semibold text-gray-700 mb-1">AI Summary:</div>
@@ -112,10 +74,123 @@ document.addEventListener('DOMContentLoaded', function() {
     </div>
   </div>
 `;
-                }).join('');
-            } else {
-                articlesDiv.innerHTML = '<p>No articles found.</p>';
-            }
+}
+
+// Parse a batch of cards once and append them as a single DocumentFragment,
+// leaving the cards already on the page untouched
+function appendArticles(container, articles) {
+    const template = document.createElement('template');
+    template.innerHTML = articles.map(renderArticle).join('');
+    container.appendChild(template.content);
+}
+
+async function loadArticlesJson(articlesDiv) {
+    const res = await fetch('/api/proptech-intelligence');
+    const data = await res.json();
+    if (data.intelligence && data.intelligence.length > 0) {
+        articlesDiv.innerHTML = '';
+        appendArticles(articlesDiv, data.intelligence);
+    } else {
+        articlesDiv.innerHTML = '<p>No articles found.</p>';
+    }
+}
+
+// Read the NDJSON stream and append each article card as soon as it arrives
+async function streamArticles(articlesDiv) {
+    const res = await fetch('/api/proptech-intelligence/stream');
+    if (!res.ok || !res.body) {
+        return loadArticlesJson(articlesDiv);
+    }
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let count = 0;
+
+    const handleEvent = (line) => {
+        if (!line.trim()) return;
+        const event = JSON.parse(line);
+        if (event.type === 'article') {
+            if (count === 0) articlesDiv.innerHTML = '';
+            appendArticles(articlesDiv, [event.article]);
+            count += 1;
+        } else if (event.type === 'error') {
+            throw new Error(event.message);
+        }
+    };
+
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split('\n');
+        buffer = lines.pop();
+        lines.forEach(handleEvent);
+    }
+    handleEvent(buffer + decoder.decode());
+    if (count === 0) {
+        articlesDiv.innerHTML = '<p>No articles found.</p>';
+    }
+}
+
+// Stored intelligence, one /api/intelligence/feed page at a time as the
+// sentinel below the list scrolls into view
+function initFeed(feedDiv, sentinel, statusEl) {
+    const margin = 800;
+    let cursor = null;
+    let loading = false;
+    let done = false;
+
+    const sentinelNearViewport = () => sentinel.getBoundingClientRect().top < window.innerHeight + margin;
+
+    const loadPage = async () => {
+        if (loading || done) return;
+        loading = true;
+        statusEl.textContent = 'Loading...';
+        try {
+            const params = new URLSearchParams();
+            if (cursor) params.set('cursor', cursor);
+            const res = await fetch(`/api/intelligence/feed?${params}`);
+            if (!res.ok) throw new Error(`Feed request failed: ${res.status}`);
+            const data = await res.json();
+            appendArticles(feedDiv, data.articles);
+            cursor = data.next_cursor;
+            done = !cursor;
+            statusEl.textContent = done && feedDiv.children.length === 0 ? 'No stored articles yet.' : '';
+        } catch (err) {
+            statusEl.textContent = 'Error loading articles.';
+            console.error('Error:', err);
+            return;
+        } finally {
+            loading = false;
+        }
+        if (done) {
+            observer.disconnect();
+        } else if (sentinelNearViewport()) {
+            // The page didn't fill the screen, so the observer won't fire again
+            loadPage();
+        }
+    };
+
+    const observer = new IntersectionObserver(entries => {
+        if (entries.some(entry => entry.isIntersecting)) loadPage();
+    }, { rootMargin: `${margin}px 0px` });
+    observer.observe(sentinel);
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    const loadBtn = document.getElementById('load-articles');
+    const articlesDiv = document.getElementById('articles');
+
+    initFeed(
+        document.getElementById('feed'),
+        document.getElementById('feed-sentinel'),
+        document.getElementById('feed-status')
+    );
+
+    loadBtn.addEventListener('click', async function() {
+        articlesDiv.innerHTML = '<p>Loading articles...</p>';
+        try {
+            await streamArticles(articlesDiv);
         } catch (err) {
             articlesDiv.innerHTML = '<p>Error loading articles.</p>';
             console.error('Error:', err);
@@ -0,0 +1,50 @@
+document.addEventListener('DOMContentLoaded', function() {
+    const loadMoreBtn = document.getElementById('load-more-analyses');
+    const analysesList = document.getElementById('analyses-list');
+    if (!loadMoreBtn) {
+        return;
+    }
+
+    const escapeHtml = (text) => String(text == null ? '' : text)
+        .replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;')
+        .replace(/"/g, '&quot;').replace(/'/g, '&#39;');
+
+    const renderAnalysis = (analysis) => {
+        const sections = analysis.sections || [];
+        const table = sections.length > 0
+            ? `<table><tbody>${sections.map(s => `<tr><th>${escapeHtml(s.section)}</th><td>${escapeHtml(s.body)}</td></tr>`).join('')}</tbody></table>`
+            : `<p>${escapeHtml(analysis.analysis || 'No structured analysis available.')}</p>`;
+        return `
+    <div class="analysis-item">
+        <div class="analysis-content">
+            <h4>Content Analyzed:</h4>
+            <p>${escapeHtml(analysis.content_preview)}</p>
+        </div>
+        <div class="analysis-result">
+            <h4>AI Analysis:</h4>
+            <div class="analysis-table">${table}</div>
+        </div>
+    </div>`;
+    };
+
+    loadMoreBtn.addEventListener('click', async function() {
+        const competitorId = loadMoreBtn.dataset.competitorId;
+        const cursor = loadMoreBtn.dataset.nextCursor;
+        loadMoreBtn.disabled = true;
+        try {
+            const params = new URLSearchParams({cursor: cursor});
+            const res = await fetch(`/api/competitor/${competitorId}/analyses?${params}`);
+            const data = await res.json();
+            analysesList.insertAdjacentHTML('beforeend', (data.analyses || []).map(renderAnalysis).join(''));
+            if (data.next_cursor) {
+                loadMoreBtn.dataset.nextCursor = data.next_cursor;
+                loadMoreBtn.disabled = false;
+            } else {
+                loadMoreBtn.remove();
+            }
+        } catch (err) {
+            loadMoreBtn.disabled = false;
+            console.error('Error:', err);
+        }
+    });
+});
@@ -0,0 +1,218 @@
+"""
+Non-blocking, structured application logging.
+
+Every logger call only puts the record on an in-memory queue; one
+listener thread per process formats it and does the file/console I/O, so
+request and event-loop threads never wait on the disk. Records are
+formatted lazily on that thread (use `logger.info("... %s", value)`, not
+f-strings, so skipped or sampled records are never built).
+
+- JSON lines with the request ID and trace ID of the request that logged them
+- Per-logger sampling of high-frequency records below WARNING (LOG_SAMPLE_EVERY)
+- A full queue drops records (and later reports how many) instead of blocking
+"""
+
+import os
+import re
+import copy
+import json
+import uuid
+import queue
+import atexit
+import logging
+import threading
+import itertools
+import contextvars
+from datetime import datetime, timezone
+from logging.handlers import QueueListener
+from flask import g, request
+
+request_id_var = contextvars.ContextVar('request_id', default=None)
+trace_id_var = contextvars.ContextVar('trace_id', default=None)
+
+_REQUEST_ID_PATTERN = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+_TRACEPARENT_PATTERN = re.compile(r'^[0-9a-f]{2}-([0-9a-f]{32})-[0-9a-f]{16}-[0-9a-f]{2}$')
+
+# Attributes every LogRecord has; anything else came from `extra=` and is logged as a field
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'request_id', 'trace_id'}
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, including `extra=` fields."""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', None),
+            'trace_id': getattr(record, 'trace_id', None),
+            'thread': record.threadName,
+            'pid': record.process,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry['stack'] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+class SamplingFilter(logging.Filter):
+    """Keep 1 in N records below WARNING for the configured loggers (and their children)."""
+
+    def __init__(self, sample_every):
+        super().__init__()
+        self.sample_every = {name: n for name, n in (sample_every or {}).items() if n > 1}
+        self._counters = {name: itertools.count() for name in self.sample_every}
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or not self.sample_every:
+            return True
+        name = record.name
+        while name:
+            if name in self.sample_every:
+                return next(self._counters[name]) % self.sample_every[name] == 0
+            name = name.rpartition('.')[0]
+        return True
+
+class BackgroundQueueHandler(logging.Handler):
+    """
+    Hands records to a QueueListener thread that runs the real handlers.
+
+    The listener is started lazily per process. It is stopped around fork()
+    so no child (e.g. a gunicorn worker) inherits a lock the thread was
+    holding mid-write; parent and child each restart it on their next record.
+    """
+
+    def __init__(self, handlers, maxsize=10000, sample_every=None):
+        super().__init__()
+        self.handlers = handlers
+        self.maxsize = maxsize
+        self.addFilter(SamplingFilter(sample_every))
+        self._start_lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._listener = None
+        self._dropped = 0
+        os.register_at_fork(
+            before=self._before_fork,
+            after_in_parent=self._after_fork,
+            after_in_child=self._after_fork_in_child
+        )
+
+    def _before_fork(self):
+        self._start_lock.acquire()
+        if self._listener is not None and self._pid == os.getpid():
+            self._pid = None  # Emitting threads now wait on the lock until after the fork
+            self._listener.stop()
+        self._listener = None
+        self._pid = None
+
+    def _after_fork(self):
+        self._start_lock.release()
+
+    def _after_fork_in_child(self):
+        self._dropped = 0  # The parent reports its own drops
+        self._after_fork()
+
+    def _ensure_listener(self):
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue(self.maxsize)
+                self._listener = QueueListener(self._queue, *self.handlers, respect_handler_level=True)
+                self._listener.start()
+                self._pid = os.getpid()
+
+    def emit(self, record):
+        try:
+            self._ensure_listener()
+            # Attach the caller's request context now; the message itself is
+            # only built (record.getMessage()) on the listener thread
+            record = copy.copy(record)
+            record.request_id = request_id_var.get()
+            record.trace_id = trace_id_var.get()
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self._dropped += 1
+            return
+        except Exception:
+            self.handleError(record)
+            return
+        if self._dropped:
+            dropped, self._dropped = self._dropped, 0
+            warning = logging.LogRecord(
+                __name__, logging.WARNING, __file__, 0,
+                'Log queue full: dropped %d records', (dropped,), None
+            )
+            try:
+                self._queue.put_nowait(warning)
+            except queue.Full:
+                self._dropped += dropped
+
+    def stop(self):
+        """Drain the queue and stop this process's listener."""
+        with self._start_lock:
+            if self._listener is not None and self._pid == os.getpid():
+                self._listener.stop()
+            self._listener = None
+            self._pid = None
+
+    def close(self):
+        self.stop()
+        super().close()
+
+_queue_handler = None
+
+def configure_logging(level, handlers, maxsize=10000, sample_every=None):
+    """
+    Route the root logger through a background queue to `handlers`.
+
+    Idempotent: later calls (e.g. gunicorn's master, then create_app) keep
+    the first configuration.
+    """
+    global _queue_handler
+    if _queue_handler is not None:
+        return _queue_handler
+    _queue_handler = BackgroundQueueHandler(handlers, maxsize=maxsize, sample_every=sample_every)
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(_queue_handler)
+    atexit.register(_queue_handler.stop)
+    return _queue_handler
+
+def incoming_request_id(headers):
+    """(request_id, trace_id) from X-Request-ID / traceparent, generating a request ID if needed."""
+    request_id = headers.get('X-Request-ID', '')
+    if not _REQUEST_ID_PATTERN.match(request_id):
+        request_id = uuid.uuid4().hex
+    match = _TRACEPARENT_PATTERN.match(headers.get('traceparent', ''))
+    return request_id, match.group(1) if match else None
+
+def _before_request():
+    g.request_id, trace_id = incoming_request_id(request.headers)
+    g.log_context_tokens = (request_id_var.set(g.request_id), trace_id_var.set(trace_id))
+
+def _after_request(response):
+    response.headers.setdefault('X-Request-ID', g.get('request_id', ''))
+    return response
+
+def _teardown_request(exception=None):
+    tokens = g.pop('log_context_tokens', None)
+    if tokens is None:
+        return
+    try:
+        request_id_var.reset(tokens[0])
+        trace_id_var.reset(tokens[1])
+    except ValueError:  # Streamed bodies can finish on another thread (a2wsgi)
+        request_id_var.set(None)
+        trace_id_var.set(None)
+
+def init_request_ids(app):
+    """Tag every log record of a request with its request/trace ID and echo X-Request-ID."""
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
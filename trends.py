@@ -0,0 +1,267 @@
+"""
+Week-over-week trend analytics for /api/trends.
+
+Loads recent article and entity-mention history in keyset batches as
+column arrays, builds one pandas frame from each, and computes everything
+else vectorized over (week x series) matrices:
+
+- PropTech keyword categories (CompetitiveScraper.PROPTECH_KEYWORD_CATEGORIES):
+  articles per week that mention at least one keyword of the category
+- Companies (entity_mentions): mentions per week of the most mentioned ones
+
+Each series gets weekly counts, a moving average, a z-score against the
+preceding TRENDS_WINDOW_WEEKS and the week-over-week change; weeks whose
+z-score reaches TRENDS_SPIKE_ZSCORE are reported as spikes. Reports are
+cached in-process for TRENDS_CACHE_TTL seconds.
+
+Keyword matching is the only expensive step, and an article's text never
+changes, so each article is scanned once per process: the per-article
+category flags are kept and later reports only scan articles added since.
+"""
+
+import re
+import time
+import logging
+import threading
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from config import Config
+from database import get_db_connection
+from scraper import CompetitiveScraper
+
+try:
+    import pyarrow  # noqa: F401  Backs the text columns so keyword matching runs in RE2, not per-row `re`
+    TEXT_DTYPE = 'string[pyarrow]'
+except ImportError:  # Optional dependency; object strings work, roughly 10x slower to scan
+    TEXT_DTYPE = object
+
+logger = logging.getLogger(__name__)
+
+_cache = {}  # weeks -> (computed_at, report)
+_cache_locks = {}  # weeks -> Lock held while that report is computed
+_cache_lock = threading.Lock()  # Guards _cache_locks
+
+_articles = {'since': None, 'last_id': 0, 'frame': None}  # Scanned article flags, see load_article_frame()
+_articles_lock = threading.Lock()
+
+def _category_patterns():
+    """One alternation per keyword category (same substring semantics as is_proptech_relevant)."""
+    return {
+        category: '|'.join(
+            re.escape(keyword.lower()) for keyword in sorted(keywords, key=len, reverse=True)
+        )
+        for category, keywords in CompetitiveScraper.PROPTECH_KEYWORD_CATEGORIES.items()
+    }
+
+def _load_columns(select, table, where, params, columns, after_id=0):
+    """
+    Read `SELECT id, <select> FROM <table> WHERE id > after_id AND <where>` in keyset batches.
+
+    Returns:
+        tuple: ({column: list of values} for the selected columns, last id read)
+    """
+    data = {column: [] for column in columns}
+    last_id = after_id
+    conn = get_db_connection()
+    try:
+        while True:
+            rows = conn.execute(
+                f'SELECT id, {select} FROM {table} WHERE id > ? AND {where} ORDER BY id LIMIT ?',
+                [last_id] + list(params) + [Config.TRENDS_LOAD_BATCH_SIZE]
+            ).fetchall()
+            if not rows:
+                break
+            for column in columns:
+                data[column].extend(row[column] for row in rows)
+            last_id = rows[-1]['id']
+    finally:
+        conn.close()
+    return data, last_id
+
+def _week_start(timestamps):
+    """Monday 00:00 of each timestamp's week."""
+    timestamps = pd.to_datetime(pd.Series(timestamps, dtype=object), format='ISO8601', errors='coerce')
+    return timestamps.dt.to_period('W-SUN').dt.start_time
+
+def scan_articles(since, after_id=0):
+    """
+    Articles scraped since `since` with id > after_id: their week plus one
+    boolean column per keyword category (matched on title and content, which
+    never change after insert).
+
+    Returns:
+        tuple: (frame, last id read)
+    """
+    data, last_id = _load_columns(
+        f'scraped_at, title, substr(content, 1, {int(Config.TRENDS_CONTENT_CHARS)}) AS content',
+        'articles', 'scraped_at >= ?', [since],
+        ['scraped_at', 'title', 'content'],
+        after_id=after_id
+    )
+    frame = pd.DataFrame({'week': _week_start(data['scraped_at'])})
+    text = (
+        pd.Series(data['title'], dtype=TEXT_DTYPE).fillna('') + ' '
+        + pd.Series(data['content'], dtype=TEXT_DTYPE).fillna('')
+    ).str.lower()
+    for category, pattern in _category_patterns().items():
+        frame[category] = text.str.contains(pattern, regex=True).astype(bool)
+    return frame, last_id
+
+def load_article_frame(since):
+    """
+    Keyword-category flags for articles scraped since `since` (a week start).
+
+    Reuses the flags of articles scanned by earlier calls and only scans
+    newer ones; a `since` earlier than anything cached triggers a full scan.
+    """
+    since_week = pd.Timestamp(since)
+    with _articles_lock:
+        if _articles['frame'] is None or since_week < _articles['since']:
+            frame, last_id = scan_articles(since)
+            _articles.update(since=since_week, last_id=last_id, frame=frame)
+        else:
+            new, last_id = scan_articles(_articles['since'].strftime('%Y-%m-%d %H:%M:%S'), after_id=_articles['last_id'])
+            frame = pd.concat([_articles['frame'], new], ignore_index=True) if len(new) else _articles['frame']
+            # Nothing older than the longest possible report is ever needed again
+            horizon = (
+                pd.Timestamp(datetime.utcnow()) - pd.Timedelta(weeks=Config.TRENDS_MAX_WEEKS + Config.TRENDS_WINDOW_WEEKS)
+            ).to_period('W-SUN').start_time
+            if _articles['since'] < horizon:
+                frame = frame[frame['week'] >= horizon].reset_index(drop=True)
+                _articles['since'] = horizon
+            _articles.update(last_id=last_id, frame=frame)
+        return frame[frame['week'] >= since_week]
+
+def load_mention_frame(since):
+    """Entity mentions since `since`: their week and entity id."""
+    data, _ = _load_columns(
+        'mentioned_at, entity_id', 'entity_mentions', 'mentioned_at >= ?', [since],
+        ['mentioned_at', 'entity_id']
+    )
+    return pd.DataFrame({
+        'week': _week_start(data['mentioned_at']),
+        'entity_id': np.asarray(data['entity_id'], dtype=np.int64)
+    })
+
+def entity_names(entity_ids):
+    """Display names for entity ids."""
+    if not entity_ids:
+        return {}
+    conn = get_db_connection()
+    placeholders = ','.join('?' * len(entity_ids))
+    rows = conn.execute(f'SELECT id, name FROM entities WHERE id IN ({placeholders})', list(entity_ids)).fetchall()
+    conn.close()
+    return {row['id']: row['name'] for row in rows}
+
+def trend_metrics(weekly, window):
+    """
+    Rolling statistics for a (week x series) count matrix.
+
+    The z-score compares each week to the `window` weeks before it, so a
+    week never dilutes its own spike.
+    """
+    baseline = weekly.shift(1).rolling(window, min_periods=2)
+    std = baseline.std().replace(0, np.nan)
+    return {
+        'counts': weekly,
+        'moving_average': weekly.rolling(window, min_periods=1).mean(),
+        'zscore': (weekly - baseline.mean()) / std,
+        'week_over_week': weekly.diff()
+    }
+
+def _weekly_counts(frame, weeks_index):
+    """Sum a frame's boolean/count columns per week, including weeks with no rows."""
+    if frame.empty:
+        return pd.DataFrame(0, index=weeks_index, columns=frame.columns.drop('week'))
+    return frame.groupby('week').sum().reindex(weeks_index, fill_value=0)
+
+def _series_payload(metrics, names, report_weeks):
+    """Per-series JSON arrays for the reported weeks (NaN becomes null)."""
+    payload = {}
+    trimmed = {
+        key: frame.iloc[-report_weeks:].round(3).astype(object).where(frame.iloc[-report_weeks:].notna(), None)
+        for key, frame in metrics.items()
+    }
+    for column in metrics['counts'].columns:
+        payload[names.get(column, str(column))] = {key: frame[column].tolist() for key, frame in trimmed.items()}
+    return payload
+
+def _spikes(metrics, names, kind, report_weeks):
+    counts = metrics['counts'].iloc[-report_weeks:]
+    zscore = metrics['zscore'].iloc[-report_weeks:]
+    mask = ((zscore >= Config.TRENDS_SPIKE_ZSCORE) & (counts >= Config.TRENDS_SPIKE_MIN_COUNT)).to_numpy(dtype=bool)
+    return [
+        {
+            'type': kind,
+            'name': names.get(counts.columns[col], str(counts.columns[col])),
+            'week': counts.index[row].strftime('%Y-%m-%d'),
+            'count': int(counts.iat[row, col]),
+            'zscore': round(float(zscore.iat[row, col]), 3)
+        }
+        for row, col in np.argwhere(mask)
+    ]
+
+def compute_trends(weeks=None):
+    """
+    Build the trends report for the last `weeks` weeks (including the current one).
+
+    Returns:
+        dict: weeks, per-series metrics for categories and companies, spikes
+    """
+    weeks = max(1, min(weeks or Config.TRENDS_DEFAULT_WEEKS, Config.TRENDS_MAX_WEEKS))
+    window = Config.TRENDS_WINDOW_WEEKS
+    started = time.perf_counter()
+
+    current_week = pd.Timestamp(datetime.utcnow()).to_period('W-SUN').start_time
+    weeks_index = pd.date_range(end=current_week, periods=weeks + window, freq='W-MON')
+    since = weeks_index[0].strftime('%Y-%m-%d %H:%M:%S')
+
+    articles = load_article_frame(since)
+    category_metrics = trend_metrics(_weekly_counts(articles, weeks_index).astype(np.int64), window)
+
+    mentions = load_mention_frame(since)
+    reported = mentions[mentions['week'] >= weeks_index[-weeks]]
+    top_ids = reported['entity_id'].value_counts().head(Config.TRENDS_TOP_COMPANIES).index
+    mentions = mentions[mentions['entity_id'].isin(top_ids)]
+    company_counts = (
+        mentions.groupby(['week', 'entity_id']).size().unstack(fill_value=0)
+        .reindex(index=weeks_index, columns=top_ids, fill_value=0).fillna(0).astype(np.int64)
+    )
+    company_metrics = trend_metrics(company_counts, window)
+    names = entity_names([int(entity_id) for entity_id in top_ids])
+
+    spikes = (
+        _spikes(category_metrics, {}, 'category', weeks)
+        + _spikes(company_metrics, names, 'company', weeks)
+    )
+    spikes.sort(key=lambda spike: (spike['week'], spike['zscore']), reverse=True)
+
+    report = {
+        'weeks': [week.strftime('%Y-%m-%d') for week in weeks_index[-weeks:]],
+        'window_weeks': window,
+        'categories': _series_payload(category_metrics, {}, weeks),
+        'companies': _series_payload(company_metrics, names, weeks),
+        'spikes': spikes,
+        'articles_analyzed': len(articles),
+        'mentions_analyzed': int(len(reported)),
+        'generated_at': datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+    }
+    logger.info("Computed %s-week trends from %s articles in %.3fs", weeks, len(articles), time.perf_counter() - started)
+    return report
+
+def get_trends(weeks=None):
+    """compute_trends(), cached per `weeks` for TRENDS_CACHE_TTL seconds."""
+    weeks = max(1, min(weeks or Config.TRENDS_DEFAULT_WEEKS, Config.TRENDS_MAX_WEEKS))
+    cached = _cache.get(weeks)
+    if cached and time.monotonic() - cached[0] < Config.TRENDS_CACHE_TTL:
+        return cached[1]
+    with _cache_lock:
+        lock = _cache_locks.setdefault(weeks, threading.Lock())
+    with lock:  # Concurrent misses for the same `weeks` wait for one computation; other keys aren't blocked
+        cached = _cache.get(weeks)
+        if cached and time.monotonic() - cached[0] < Config.TRENDS_CACHE_TTL:
+            return cached[1]
+        report = compute_trends(weeks)
+        _cache[weeks] = (time.monotonic(), report)
+        return report